@@ -1,5 +1,17 @@
+import pathlib
+
 import pytest
 
+from testsuite.databases.pgsql import discover
+
+SCHEMAS_DIR = pathlib.Path(__file__).parent.joinpath('schemas')
+
+
+@pytest.fixture(scope='session')
+def pgsql_local(pgsql_local_create):
+    databases = discover.find_schemas('service', [SCHEMAS_DIR])
+    return pgsql_local_create(list(databases.values()))
+
 
 @pytest.fixture(scope='session')
 def pgsql_cleanup_exclude_tables():
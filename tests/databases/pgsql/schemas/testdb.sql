@@ -10,3 +10,18 @@ CREATE TABLE no_clean_table (
 
 INSERT INTO no_clean_table (id, value) VALUES (1, 'one');
 INSERT INTO no_clean_table (id, value) VALUES (2, 'two');
+
+CREATE TABLE parent (
+  id SERIAL PRIMARY KEY
+);
+
+CREATE TABLE child (
+  id SERIAL PRIMARY KEY,
+  parent_id INTEGER NOT NULL REFERENCES parent (id)
+);
+
+CREATE TABLE tabular (
+  id INTEGER PRIMARY KEY,
+  value TEXT,
+  payload JSONB
+);
@@ -0,0 +1,2 @@
+INSERT INTO foo (id, value) VALUES (1, 'one');
+INSERT INTO foo (id, value) VALUES (2, 'two');
@@ -1,17 +1,8 @@
-import pathlib
+import asyncio
 
+import psycopg2.extras
 import pytest
 
-from testsuite.databases.pgsql import discover
-
-SCHEMAS_DIR = pathlib.Path(__file__).parent.joinpath('schemas')
-
-
-@pytest.fixture(scope='session')
-def pgsql_local(pgsql_local_create):
-    databases = discover.find_schemas('service', [SCHEMAS_DIR])
-    return pgsql_local_create(list(databases.values()))
-
 
 @pytest.mark.pgsql('testdb', files=['test_file_data.sql'])
 def test_file_data(pgsql):
@@ -28,3 +19,37 @@ def test_file_data(pgsql):
 @pytest.mark.pgsql('testdb', files=['test_file_data.sql'])
 def test_sql_error(pgsql):
     pass
+
+
+@pytest.mark.pgsql('testdb', files=['test_file_data.sql'])
+async def test_async_queries(pgsql):
+    db = pgsql['testdb']
+    await db.execute("INSERT INTO foo (id, value) VALUES (3, 'three')")
+    assert await db.fetchall('SELECT * FROM foo ORDER BY id') == [
+        (1, 'one'),
+        (2, 'two'),
+        (3, 'three'),
+    ]
+    row = await db.fetchone(
+        'SELECT value FROM foo WHERE id = %s',
+        (2,),
+        cursor_factory=psycopg2.extras.RealDictCursor,
+    )
+    assert row == {'value': 'two'}
+
+
+async def test_async_query_does_not_block_loop(pgsql):
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.ensure_future(tick())
+    try:
+        await pgsql['testdb'].execute('SELECT pg_sleep(0.2)')
+    finally:
+        task.cancel()
+    assert ticks > 5
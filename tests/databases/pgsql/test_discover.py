@@ -1,3 +1,6 @@
+import os
+import pathlib
+
 import pytest
 
 from testsuite.databases.pgsql import discover, exceptions
@@ -49,3 +52,64 @@ def test_shortened():
     )
     with pytest.raises(exceptions.NameCannotBeShortend):
         discover._shortened('f_' * 32, '')
+
+
+def test_find_schemas_cached(tmp_path, monkeypatch):
+    tmp_path.joinpath('foo.sql').write_text('')
+    tmp_path.joinpath('bar').mkdir()
+    tmp_path.joinpath('bar', '0000.sql').write_text('')
+    _set_mtime(tmp_path, tmp_path.joinpath('bar'))
+
+    databases = discover.find_schemas(None, [tmp_path])
+    assert sorted(databases) == ['bar', 'foo']
+
+    iterdir_calls = []
+    original_iterdir = pathlib.Path.iterdir
+
+    def iterdir(self):
+        iterdir_calls.append(self)
+        return original_iterdir(self)
+
+    monkeypatch.setattr(pathlib.Path, 'iterdir', iterdir)
+    assert discover.find_schemas(None, [tmp_path]) == databases
+    assert iterdir_calls == []
+
+    tmp_path.joinpath('bar', '0001.sql').write_text('')
+    databases = discover.find_schemas(None, [tmp_path])
+    assert databases['bar'].shards[0].files == [
+        tmp_path.joinpath('bar', '0000.sql'),
+        tmp_path.joinpath('bar', '0001.sql'),
+    ]
+    assert iterdir_calls
+
+
+def test_find_schemas_large_layout(tmp_path, monkeypatch):
+    for db_index in range(200):
+        tmp_path.joinpath(f'db{db_index}.sql').write_text('')
+        for shard in range(4):
+            shard_dir = tmp_path.joinpath(f'sharded{db_index}@{shard}')
+            shard_dir.mkdir()
+            shard_dir.joinpath('0000.sql').write_text('')
+            _set_mtime(shard_dir)
+    _set_mtime(tmp_path)
+
+    databases = discover.find_schemas('large', [tmp_path])
+    assert len(databases) == 400
+
+    stat_calls = []
+    original_stat = pathlib.Path.stat
+
+    def stat(self, **kwargs):
+        stat_calls.append(self)
+        return original_stat(self, **kwargs)
+
+    monkeypatch.setattr(pathlib.Path, 'stat', stat)
+    assert discover.find_schemas('large', [tmp_path]) == databases
+    # Only scanned directories are checked, schema files are not touched
+    assert stat_calls
+    assert not [path for path in stat_calls if path.suffix == '.sql']
+
+
+def _set_mtime(*paths):
+    for path in paths:
+        os.utime(path, ns=(0, 0))
@@ -0,0 +1,25 @@
+import concurrent.futures
+import time
+
+from testsuite.databases.pgsql import pool
+
+
+def test_pool_waits_for_connection(pgsql, _pgsql_control):
+    connection_pool = pool.AutocommitConnectionPool(
+        minconn=1,
+        maxconn=2,
+        uri=_pgsql_control._get_connection_uri('postgres'),
+    )
+
+    def query(_):
+        with connection_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                time.sleep(0.01)
+                return cursor.fetchone()
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            assert list(executor.map(query, range(16))) == [(1,)] * 16
+    finally:
+        connection_pool.close()
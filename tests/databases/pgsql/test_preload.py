@@ -0,0 +1,35 @@
+import pytest
+
+from testsuite.databases.pgsql import control
+
+
+@pytest.mark.parametrize('value', ['three', 'four', 'five'])
+@pytest.mark.pgsql('testdb', files=['test_file_data.sql'])
+def test_preloaded_data(pgsql, value):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('SELECT * FROM foo ORDER BY id')
+    assert cursor.fetchall() == [(1, 'one'), (2, 'two')]
+    cursor.execute('INSERT INTO foo (id, value) VALUES (3, %s)', (value,))
+
+
+def test_preloaded_queries(pgsql, _pgsql):
+    conn = _pgsql['testdb']
+    queries = [
+        control.PgQuery(
+            body="INSERT INTO foo (id, value) VALUES (1, 'one')",
+            source='test',
+            path=None,
+        ),
+    ]
+
+    conn.schedule_truncation(queries)
+    conn.apply_queries(queries)
+    with conn.cursor() as cursor:
+        cursor.execute('SELECT * FROM foo')
+        assert cursor.fetchall() == [(1, 'one')]
+
+    conn.schedule_truncation(queries)
+    conn.apply_queries([])
+    with conn.cursor() as cursor:
+        cursor.execute('SELECT * FROM foo')
+        assert cursor.fetchall() == []
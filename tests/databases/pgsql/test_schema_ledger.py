@@ -0,0 +1,84 @@
+import psycopg2
+import pytest
+
+from testsuite.databases.pgsql import control, discover
+
+LEDGER_DBNAME = 'ledger_service_ledger'
+
+
+@pytest.fixture
+def initialize_schema(_pgsql, _pgsql_conninfo, tmp_path, monkeypatch):
+    scripts = []
+    run_script = control.PgControl._run_script
+
+    def _run_script(self, dbname, path):
+        scripts.append(path.name)
+        run_script(self, dbname, path)
+
+    monkeypatch.setattr(control.PgControl, '_run_script', _run_script)
+
+    def initialize():
+        scripts.clear()
+        database = discover.find_schemas('ledger_service', [tmp_path])['ledger']
+        instance = control.PgControl(
+            _pgsql_conninfo, verbose=0, skip_applied_schemas=True
+        )
+        try:
+            instance.initialize()
+            instance.initialize_sharded_db(database)
+        finally:
+            instance.close()
+        return scripts
+
+    yield initialize
+
+    _execute(
+        _pgsql_conninfo.replace(dbname='postgres'),
+        'DELETE FROM applied_schemas WHERE db_name = %s',
+        'DELETE FROM applied_schema_files WHERE db_name = %s',
+        control.DROP_DATABASE_TEMPLATE.format(LEDGER_DBNAME),
+    )
+
+
+def test_schema_delta_applied(initialize_schema, _pgsql_conninfo, tmp_path):
+    schema_dir = tmp_path.joinpath('ledger')
+    schema_dir.mkdir()
+    schema_dir.joinpath('0001.sql').write_text('CREATE TABLE foo (id INT);')
+    assert initialize_schema() == ['0001.sql']
+    assert initialize_schema() == []
+
+    conninfo = _pgsql_conninfo.replace(dbname=LEDGER_DBNAME)
+    _execute(conninfo, 'INSERT INTO foo VALUES (1)')
+    schema_dir.joinpath('0002.sql').write_text('CREATE TABLE bar (id INT);')
+    assert initialize_schema() == ['0002.sql']
+    _execute(conninfo, 'SELECT * FROM foo, bar')
+    assert _fetch(conninfo, 'SELECT * FROM foo') == [(1,)]
+
+    # Changed history requires full rebuild
+    schema_dir.joinpath('0001.sql').write_text('CREATE TABLE foo (x INT);')
+    assert initialize_schema() == ['0001.sql', '0002.sql']
+    assert _fetch(conninfo, 'SELECT * FROM foo') == []
+
+
+def _execute(conninfo, *queries):
+    conn = psycopg2.connect(conninfo.get_uri())
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            for query in queries:
+                if '%s' in query:
+                    cursor.execute(query, (LEDGER_DBNAME,))
+                else:
+                    cursor.execute(query)
+    finally:
+        conn.close()
+
+
+def _fetch(conninfo, query):
+    conn = psycopg2.connect(conninfo.get_uri())
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            return cursor.fetchall()
+    finally:
+        conn.close()
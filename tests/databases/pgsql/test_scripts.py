@@ -0,0 +1,47 @@
+import pytest
+
+
+def test_script_session_state_not_leaked(_pgsql_control, pgsql, tmp_path):
+    conninfo = pgsql['testdb'].conninfo
+    script = tmp_path.joinpath('script.sql')
+    script.write_text(
+        "SELECT set_config('search_path', '', false);\n"
+        'CREATE TEMPORARY TABLE leaked (id INT);\n'
+    )
+    assert _pgsql_control._run_script_in_process(conninfo.dbname, script)
+
+    # pylint: disable=protected-access
+    manager = _pgsql_control._connection_manager
+    conn = manager.getconn(conninfo)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SHOW search_path')
+            assert cursor.fetchone() == ('"$user", public',)
+            cursor.execute("SELECT to_regclass('leaked')")
+            assert cursor.fetchone() == (None,)
+    finally:
+        manager.putconn(conninfo, conn)
+
+
+@pytest.mark.parametrize(
+    'script, in_process',
+    [
+        ('BEGIN;\nCREATE TABLE script_table (id INT);\nCOMMIT;\n', False),
+        ('CREATE TABLE script_table (id INT); commit;\n', False),
+        ('\\set ON_ERROR_STOP 1\nCREATE TABLE script_table (id INT);\n', False),
+        (
+            'CREATE FUNCTION foo() RETURNS INT AS $$\n'
+            'BEGIN\n'
+            '    RETURN 1;\n'
+            'END;\n'
+            '$$ LANGUAGE plpgsql;\n'
+            'DROP FUNCTION foo();\n',
+            True,
+        ),
+    ],
+)
+def test_script_in_process(_pgsql_control, pgsql, tmp_path, script, in_process):
+    dbname = pgsql['testdb'].conninfo.dbname
+    path = tmp_path.joinpath('script.sql')
+    path.write_text(script)
+    assert _pgsql_control._run_script_in_process(dbname, path) == in_process
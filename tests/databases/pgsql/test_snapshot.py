@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def pgsql_snapshot_databases():
+    return frozenset({'testdb'})
+
+
+@pytest.mark.pgsql('testdb', files=['test_file_data.sql'])
+def test_snapshot_created(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('select * from foo order by id')
+    assert cursor.fetchall() == [(1, 'one'), (2, 'two')]
+    cursor.execute("INSERT INTO foo (id, value) VALUES (3, 'three')")
+
+
+@pytest.mark.pgsql('testdb', files=['test_file_data.sql'])
+def test_snapshot_restored(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('select * from foo order by id')
+    assert cursor.fetchall() == [(1, 'one'), (2, 'two')]
+    cursor.execute('DELETE FROM foo')
+
+
+@pytest.mark.pgsql('testdb', files=['test_file_data.sql'])
+def test_snapshot_spare(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('select * from foo order by id')
+    assert cursor.fetchall() == [(1, 'one'), (2, 'two')]
+
+
+@pytest.mark.pgsql('testdb', queries=["INSERT INTO foo (value) VALUES ('x')"])
+def test_snapshot_other_queries(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('select * from foo order by id')
+    assert cursor.fetchall() == [(1, 'x')]
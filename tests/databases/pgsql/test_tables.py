@@ -0,0 +1,57 @@
+import pytest
+
+from testsuite.databases.pgsql import exceptions
+
+
+@pytest.mark.pgsql('testdb', tables=['tabular.csv'])
+def test_csv(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('SELECT id, value FROM tabular ORDER BY id')
+    assert cursor.fetchall() == [
+        (1, 'one'),
+        (2, 'two, "quoted"'),
+        (3, None),
+        (4, ''),
+    ]
+
+
+@pytest.mark.pgsql('testdb', tables=['tabular.tsv'])
+def test_tsv(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('SELECT id, value FROM tabular ORDER BY id')
+    assert cursor.fetchall() == [(1, 'one'), (2, 'two'), (3, None)]
+
+
+@pytest.mark.pgsql('testdb', tables=['tabular.jsonl'])
+def test_json_lines(pgsql, mockserver_info):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('SELECT id, value, payload FROM tabular ORDER BY id')
+    assert cursor.fetchall() == [
+        (1, 'one', {'a': [1, True]}),
+        (2, None, None),
+        (
+            3,
+            f'http://{mockserver_info.host}:{mockserver_info.port}',
+            None,
+        ),
+    ]
+
+
+@pytest.mark.pgsql(
+    'testdb',
+    tables=['public.parent.csv', 'public.child.jsonl'],
+    queries=['INSERT INTO child (id, parent_id) VALUES (2, 1)'],
+)
+def test_mixed_with_queries(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('SELECT id, parent_id FROM child ORDER BY id')
+    assert cursor.fetchall() == [(1, 2), (2, 1)]
+
+
+def test_copy_error(_pgsql, _pgsql_query_loader):
+    queries = _pgsql_query_loader.load_table('public.child.jsonl', 'test')
+    with pytest.raises(
+        exceptions.PostgresqlError,
+        match='Query from: test\nFile path: .*public.child.jsonl',
+    ):
+        _pgsql['testdb'].apply_queries(queries)
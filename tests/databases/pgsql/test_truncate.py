@@ -0,0 +1,115 @@
+import pathlib
+
+import psycopg2
+import pytest
+
+from testsuite.databases.pgsql import (
+    control,
+    discover,
+    exceptions,
+    pytest_plugin,
+)
+
+SCHEMAS_DIR = pathlib.Path(__file__).parent.joinpath('schemas')
+
+
+@pytest.fixture(scope='session')
+def pgsql_local(_pgsql_control, pgsql_cleanup_exclude_tables):
+    # Own database, connections of shared one are set up for full truncation
+    databases = discover.find_schemas('truncate', [SCHEMAS_DIR])
+    return pytest_plugin.ServiceLocalConfig(
+        list(databases.values()),
+        _pgsql_control,
+        pgsql_cleanup_exclude_tables,
+        truncate_modified_only=True,
+    )
+
+
+def test_referenced_table_modified(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('INSERT INTO parent DEFAULT VALUES RETURNING id')
+    assert cursor.fetchall() == [(1,)]
+
+
+def test_referenced_table_truncated(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('INSERT INTO parent DEFAULT VALUES RETURNING id')
+    assert cursor.fetchall() == [(1,)]
+    cursor.execute('INSERT INTO child (parent_id) VALUES (1) RETURNING id')
+    assert cursor.fetchall() == [(1,)]
+
+
+def test_sequence_used(pgsql):
+    conn = pgsql['testdb'].conn
+    with pytest.raises(psycopg2.IntegrityError):
+        with conn.cursor() as cursor:
+            cursor.execute('INSERT INTO child (parent_id) VALUES (1)')
+
+
+def test_sequence_restarted(pgsql):
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute('SELECT COUNT(*) FROM parent')
+    assert cursor.fetchall() == [(0,)]
+    cursor.execute("INSERT INTO foo (value) VALUES ('one') RETURNING id")
+    assert cursor.fetchall() == [(1,)]
+    cursor.execute('INSERT INTO parent DEFAULT VALUES RETURNING id')
+    assert cursor.fetchall() == [(1,)]
+    cursor.execute('INSERT INTO child (parent_id) VALUES (1) RETURNING id')
+    assert cursor.fetchall() == [(1,)]
+
+
+@pytest.fixture
+def lock_holder(pgsql, monkeypatch):
+    monkeypatch.setattr(control, 'TRUNCATE_LOCK_TIMEOUT_MS', 50)
+    cursor = pgsql['testdb'].cursor()
+    cursor.execute("INSERT INTO foo (id, value) VALUES (1, 'one')")
+    conn = psycopg2.connect(pgsql['testdb'].conninfo.get_uri())
+    with conn.cursor() as cursor:
+        cursor.execute('SELECT * FROM foo')
+        yield conn
+    conn.close()
+
+
+def test_idle_in_transaction_terminated(_pgsql, lock_holder, caplog):
+    _pgsql['testdb'].apply_queries([])
+    assert 'Terminating idle in transaction backend' in caplog.text
+    with pytest.raises(psycopg2.OperationalError):
+        with lock_holder.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+
+def test_not_blocking_backend_kept(pgsql, _pgsql, lock_holder):
+    conn = psycopg2.connect(pgsql['testdb'].conninfo.get_uri())
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT * FROM parent')
+        _pgsql['testdb'].apply_queries([])
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+def test_blocking_backends_reported(_pgsql, lock_holder, monkeypatch):
+    monkeypatch.setattr(control, 'TRUNCATE_RETRIES', 1)
+    monkeypatch.setattr(control, 'IDLE_IN_TRANSACTION_STATES', frozenset())
+    with pytest.raises(exceptions.PostgresqlError) as exc_info:
+        _pgsql['testdb'].apply_queries([])
+    assert f'pid={lock_holder.get_backend_pid()} ' in str(exc_info.value)
+    lock_holder.rollback()
+
+
+def test_modified_tables_lookup_lock_reported(pgsql, _pgsql, monkeypatch):
+    monkeypatch.setattr(control, 'TRUNCATE_LOCK_TIMEOUT_MS', 50)
+    monkeypatch.setattr(control, 'TRUNCATE_RETRIES', 1)
+    monkeypatch.setattr(control, 'IDLE_IN_TRANSACTION_STATES', frozenset())
+    conn = psycopg2.connect(pgsql['testdb'].conninfo.get_uri())
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('LOCK TABLE foo IN ACCESS EXCLUSIVE MODE')
+        with pytest.raises(exceptions.PostgresqlError) as exc_info:
+            _pgsql['testdb'].apply_queries([])
+        assert f'pid={conn.get_backend_pid()} ' in str(exc_info.value)
+    finally:
+        conn.close()
@@ -0,0 +1,83 @@
+import pathlib
+
+import psycopg2
+import pytest
+
+from testsuite.databases.pgsql import control, discover
+
+SCHEMAS_DIR = pathlib.Path(__file__).parent.joinpath('schemas')
+WORKER_DATABASES = (
+    'service_testdb_gw0',
+    'service_testdb_gw1',
+    'service_testdb_tstemplate',
+)
+
+
+@pytest.fixture
+def create_worker_control(_pgsql, _pgsql_conninfo, tmp_path):
+    controls = []
+
+    def create(worker_id):
+        instance = control.PgControl(
+            _pgsql_conninfo,
+            verbose=0,
+            skip_applied_schemas=False,
+            worker_id=worker_id,
+            worker_lock_path=tmp_path.joinpath('templates.lock'),
+        )
+        controls.append(instance)
+        instance.initialize()
+        return instance
+
+    yield create
+
+    for instance in controls:
+        instance.close()
+    _execute(
+        _pgsql_conninfo.replace(dbname='postgres'),
+        'DELETE FROM applied_schemas WHERE db_name = '
+        "'service_testdb_tstemplate'",
+        *[
+            control.DROP_DATABASE_TEMPLATE.format(dbname)
+            for dbname in WORKER_DATABASES
+        ],
+    )
+
+
+def test_worker_databases_cloned(create_worker_control, monkeypatch):
+    database = discover.find_schemas('service', [SCHEMAS_DIR])['testdb']
+    scripts = []
+    run_script = control.PgControl._run_script
+
+    def _run_script(self, dbname, path):
+        scripts.append(dbname)
+        run_script(self, dbname, path)
+
+    monkeypatch.setattr(control.PgControl, '_run_script', _run_script)
+
+    for worker_id in ('gw0', 'gw1'):
+        worker_control = create_worker_control(worker_id)
+        worker_control.initialize_sharded_db(database)
+        conninfo = worker_control.get_connection_cached(
+            'service_testdb'
+        ).conninfo
+        assert conninfo.dbname == f'service_testdb_{worker_id}'
+
+        with psycopg2.connect(conninfo.get_uri()) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT count(*) FROM foo')
+                assert cursor.fetchone() == (0,)
+
+    # Schema is applied once to template database shared by workers
+    assert scripts == ['service_testdb_tstemplate']
+
+
+def _execute(conninfo, *queries):
+    conn = psycopg2.connect(conninfo.get_uri())
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            for query in queries:
+                cursor.execute(query)
+    finally:
+        conn.close()
@@ -0,0 +1,63 @@
+import contextlib
+import time
+
+import redis
+
+from testsuite.databases.redis import cleanup
+
+
+def test_modified_keys_unlinked(redis_standalone_store: redis.StrictRedis):
+    tracker = cleanup.KeyspaceTracker([redis_standalone_store])
+    with contextlib.closing(tracker):
+        assert not tracker.cleanup()
+
+        redis_standalone_store.set('foo', 'bar')
+        redis_standalone_store.hset('baz', 'quux', 'bat')
+        redis_standalone_store.set('deleted', 'value')
+        redis_standalone_store.delete('deleted')
+        assert tracker.cleanup()
+        assert redis_standalone_store.dbsize() == 0
+
+        # Keys unlinked on cleanup are not reported again
+        assert not tracker.cleanup()
+
+
+def test_other_database_flushed(
+    redis_standalone_store: redis.StrictRedis, redis_standalone_node
+):
+    tracker = cleanup.KeyspaceTracker([redis_standalone_store])
+    other_db = redis.StrictRedis(
+        host=redis_standalone_node['host'],
+        port=redis_standalone_node['port'],
+        db=1,
+    )
+    with contextlib.closing(tracker), contextlib.closing(other_db):
+        other_db.set('foo', 'bar')
+        assert tracker.cleanup()
+        assert other_db.dbsize() == 0
+
+
+def test_flushed_after_subscriber_reconnect(
+    redis_standalone_store: redis.StrictRedis, monkeypatch
+):
+    monkeypatch.setattr(cleanup, 'PONG_TIMEOUT', 60.0)
+    tracker = cleanup.KeyspaceTracker([redis_standalone_store])
+    with contextlib.closing(tracker):
+        limits = redis_standalone_store.config_get('client-output-buffer-limit')
+        pubsub_limit = limits.get('client-output-buffer-limit')
+        assert pubsub_limit is not None
+        assert 'pubsub 0 0 0' in pubsub_limit
+
+        redis_standalone_store.client_kill_filter(_type='pubsub')
+        redis_standalone_store.set('foo', 'bar')
+        started = time.monotonic()
+        assert tracker.cleanup()
+        # Reconnect is detected without waiting for notifications
+        assert time.monotonic() - started < cleanup.PONG_TIMEOUT
+        assert redis_standalone_store.dbsize() == 0
+
+        # Keys are tracked again after resubscribe
+        redis_standalone_store.set('foo', 'bar')
+        assert tracker.cleanup()
+        assert redis_standalone_store.dbsize() == 0
+        assert not tracker.cleanup()
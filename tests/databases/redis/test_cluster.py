@@ -18,3 +18,17 @@ def test_cluster_config(
 def test_cluster_rw(redis_cluster_store: redis.RedisCluster):
     assert redis_cluster_store.set('foo', b'bar')
     assert redis_cluster_store.get('foo') == b'bar'
+
+
+@pytest.mark.redis_cluster_store(
+    *[['set', f'key{index}', index] for index in range(100)],
+    ['expire', 'key0', 100],
+    ['mset_nonatomic', {'foo': 'bar', 'baz': 'quux'}],
+)
+def test_cluster_store_mark(redis_cluster_store: redis.RedisCluster):
+    assert redis_cluster_store.get('key99') == b'99'
+    assert redis_cluster_store.ttl('key0') > 0
+    assert redis_cluster_store.mget_nonatomic('foo', 'baz') == [
+        b'bar',
+        b'quux',
+    ]
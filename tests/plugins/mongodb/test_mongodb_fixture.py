@@ -17,3 +17,78 @@ def test_fixtures_loaded(mongodb):
 @pytest.mark.mongodb_collections('bar')
 def test_mark_adds_collection_to_mongodb(mongodb):
     assert set(mongodb.get_aliases()) == {'foo', 'bar'}
+
+
+def test_fixtures_modified(mongodb):
+    mongodb.foo.insert_one({'_id': 'bar'})
+    mongodb.foo.delete_one({'_id': 'foo'})
+
+
+def test_fixtures_reloaded_after_modification(mongodb):
+    assert list(mongodb.foo.find()) == [{'_id': 'foo'}]
+
+
+def test_fixtures_dropped(mongodb):
+    mongodb.foo.drop()
+
+
+def test_fixtures_reloaded_after_drop(mongodb):
+    assert list(mongodb.foo.find()) == [{'_id': 'foo'}]
+
+
+def test_fixture_documents_cached(_mongo_query_loader, _mongo_fixture_cache):
+    fixture_hash, docs = _mongo_query_loader('db_foo.json')
+    assert [dict(doc) for doc in docs] == [{'_id': 'foo'}]
+    assert len(_mongo_fixture_cache) == 1
+    assert _mongo_query_loader('db_foo.json') == (fixture_hash, docs)
+    assert len(_mongo_fixture_cache) == 1
+
+
+def test_fixture_load_threads(mongo_fixture_load_threads):
+    assert mongo_fixture_load_threads == 4
+
+
+def test_fixture_snapshot(_mongo_snapshot_loader, _mongo_query_loader):
+    fixture_hash, load_docs = _mongo_snapshot_loader('db_foo.json')
+    assert fixture_hash.startswith('snapshot:')
+    docs = load_docs()
+    assert [dict(doc) for doc in docs] == [{'_id': 'foo'}]
+    assert _mongo_snapshot_loader('db_foo.json')[0] == fixture_hash
+
+
+@pytest.mark.filldb_snapshot
+def test_fixtures_loaded_from_snapshot(mongodb):
+    assert list(mongodb.foo.find()) == [{'_id': 'foo'}]
+
+
+def test_collection_wrapper_reused(
+    _mongo_collection_wrapper_factory, mongodb_settings
+):
+    factory = _mongo_collection_wrapper_factory
+    wrapper = factory.create_collection_wrapper(['foo'], mongodb_settings)
+    reused = factory.create_collection_wrapper(['foo'], mongodb_settings)
+    assert reused is wrapper
+    extended = factory.create_collection_wrapper(
+        ['foo', 'bar'], mongodb_settings
+    )
+    assert extended is not wrapper
+    assert extended['foo'] is wrapper['foo']
+
+    overlay = factory.create_collection_wrapper(
+        ['foo'], mongodb_settings, extra_names=['bar', 'foo']
+    )
+    assert overlay is not extended
+    assert overlay.get_aliases() == ('foo', 'bar')
+    assert overlay['foo'] is wrapper['foo']
+    assert (
+        factory.create_collection_wrapper(
+            ['foo'], mongodb_settings, extra_names=['bar']
+        )
+        is overlay
+    )
+    assert (
+        factory.create_collection_wrapper(
+            ['foo'], mongodb_settings, extra_names=['foo']
+        )
+        is wrapper
+    )
@@ -0,0 +1,5 @@
+\set default_value 'third'
+
+CREATE TABLE multidir3(
+       value VARCHAR(100) DEFAULT :'default_value'
+);
@@ -1,3 +1,4 @@
+import os
 import pathlib
 
 import pytest
@@ -43,6 +44,38 @@ def test_hash_changes_with_file_name(temp_dir_path):
     assert hash_original2 == hash_original
 
 
+def test_hash_cache(temp_dir_path):
+    file = temp_dir_path.joinpath('file')
+    cache_path = temp_dir_path.joinpath('cache', 'hashes.json')
+    file.write_bytes(b'abc')
+    os.utime(file, ns=(0, 0))
+
+    cache = utils.FilesHashCache(cache_path)
+    hash_original = utils.get_files_hash([file], cache)
+    cache.save()
+    assert cache_path.exists()
+
+    # Same size, mtime and inode: cached hash is used
+    file.write_bytes(b'abd')
+    os.utime(file, ns=(0, 0))
+    cache = utils.FilesHashCache(cache_path)
+    assert utils.get_files_hash([file], cache) == hash_original
+
+    os.utime(file, ns=(10**9, 10**9))
+    assert utils.get_files_hash([file], cache) != hash_original
+
+
+def test_hash_cache_skips_recent_files(temp_dir_path):
+    file = temp_dir_path.joinpath('file')
+    cache_path = temp_dir_path.joinpath('hashes.json')
+    file.write_bytes(b'abc')
+
+    cache = utils.FilesHashCache(cache_path)
+    utils.get_files_hash([file], cache)
+    cache.save()
+    assert not cache_path.exists()
+
+
 @pytest.fixture
 def temp_dir_path(testdir):
     return pathlib.Path(testdir.tmpdir.strpath)
@@ -1,8 +1,9 @@
+import logging
 import pathlib
 
 import pytest
 
-from testsuite.databases.pgsql import discover
+from testsuite.databases.pgsql import control, discover, exceptions
 
 BASE_PATH = pathlib.Path(__file__).parent / 'static/postgresql'
 SQLDATA_PATH = BASE_PATH / 'schemas'
@@ -70,6 +71,24 @@ def test_pgsql_mark_files(pgsql):
         assert result == ['custom%d' % shard_id]
 
 
+def test_apply_queries_error(_pgsql):
+    queries = [
+        control.PgQuery(
+            body="INSERT INTO foo VALUES ('ok')", source='first', path=None
+        ),
+        control.PgQuery(
+            body='INSERT INTO missing VALUES (1)',
+            source='second',
+            path='second.sql',
+        ),
+    ]
+    with pytest.raises(
+        exceptions.PostgresqlError,
+        match='Query from: second\nFile path: second.sql',
+    ):
+        _pgsql['foo@0'].apply_queries(queries)
+
+
 def test_multidir_schema(pgsql):
     cursor = pgsql['multidir'].cursor()
     cursor.execute('SELECT value from multidir1')
@@ -81,6 +100,10 @@ def test_multidir_schema(pgsql):
     result = sorted(row[0] for row in cursor)
     assert result == []
 
+    cursor = pgsql['multidir'].cursor()
+    cursor.execute('INSERT INTO multidir3 DEFAULT VALUES RETURNING value')
+    assert cursor.fetchall() == [('third',)]
+
 
 def test_migrations(pgsql):
     cursor = pgsql['pgmigrate'].cursor()
@@ -89,6 +112,33 @@ def test_migrations(pgsql):
     assert result == []
 
 
+def test_migrations_in_process(
+    pgsql, _pgsql_control, tmp_path, monkeypatch, caplog
+):
+    pytest.importorskip('pgmigrate')
+    caplog.set_level(logging.DEBUG, logger='testsuite.databases.pgsql')
+
+    def execute(*args, **kwargs):
+        assert False, 'pgmigrate must not be started as subprocess'
+
+    monkeypatch.setattr(control.shell, 'execute', execute)
+    tmp_path.joinpath('migrations').mkdir()
+    tmp_path.joinpath('migrations', 'V02__in_process.sql').write_text(
+        'CREATE TABLE in_process (id INT)',
+    )
+    _pgsql_control._run_pgmigrate('service_pgmigrate', tmp_path)
+
+    cursor = pgsql['pgmigrate'].cursor()
+    cursor.execute('SELECT version FROM schema_version ORDER BY version')
+    assert cursor.fetchall() == [(1,), (2,)]
+    assert any(
+        record.getMessage().startswith('pgmigrate: ')
+        for record in caplog.records
+    )
+    cursor.execute('DROP TABLE in_process')
+    cursor.execute('DELETE FROM schema_version WHERE version = 2')
+
+
 def test_migrations_shards(pgsql):
     cursor = pgsql['pgmigrate_sharded@0'].cursor()
     cursor.execute('SELECT value0 from migrations')
@@ -101,10 +151,13 @@ def test_migrations_shards(pgsql):
     assert result == []
 
 
-def test_reconnect(pgsql):
+def test_reconnect(pgsql, _pgsql_control):
+    discarded = _pgsql_control.get_connection_stats()['service_foo_0'].discarded
     pgsql['foo@0'].conn.close()
     with pytest.warns(UserWarning):
         assert pgsql['foo@0'].conn is not None
+    stats = _pgsql_control.get_connection_stats()['service_foo_0']
+    assert stats.discarded == discarded + 1
 
 
 @pytest.mark.pgsql('foo@0', queries=["INSERT INTO foo VALUES ('mark1')"])
@@ -114,3 +167,9 @@ def test_dict_cursor(pgsql):
     row = cursor.fetchone()
     assert row == ['mark1']
     assert {**row} == {'value': 'mark1'}
+
+
+def test_query_loader_cache(_pgsql_query_loader):
+    queries = _pgsql_query_loader.load('pg_foo@0.sql', 'test')
+    assert _pgsql_query_loader.load('pg_foo@0.sql', 'test') == queries
+    assert queries[0] is _pgsql_query_loader.load('pg_foo@0.sql', 'test')[0]
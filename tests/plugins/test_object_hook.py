@@ -0,0 +1,23 @@
+from testsuite.plugins import object_hook
+
+
+def test_parsed_files_cache(tmp_path):
+    cache = object_hook.ParsedFilesCache(
+        {'$match': object(), '$mockserver': {'$fixture': 'mockserver'}},
+    )
+    static_path = tmp_path.joinpath('static.json')
+    static_path.write_text('[{"$match": "any-string"}]')
+    per_test_path = tmp_path.joinpath('per_test.json')
+    per_test_path.write_text('[{"$mockserver": "/foo"}]')
+
+    parsed = []
+
+    def parse(path):
+        parsed.append(path.name)
+        return [path.name]
+
+    for _ in range(2):
+        for path in (static_path, per_test_path):
+            assert cache.load(path, lambda: parse(path)) == [path.name]
+    assert parsed == ['static.json', 'per_test.json', 'per_test.json']
+    assert len(cache) == 2
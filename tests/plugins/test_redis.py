@@ -42,3 +42,14 @@ def _check_store_file(redis_store):
     assert json.loads(redis_store.hget('complicated', b'key')) == {
         'sub_key': 'subvalue',
     }
+
+
+@pytest.mark.redis_store(
+    *[['set', f'key{index}', index] for index in range(2500)],
+    ['expire', 'key0', 100],
+)
+@pytest.mark.nofilldb
+def test_redis_store_many_commands(redis_store):
+    assert redis_store.dbsize() == 2500
+    assert redis_store.get('key2499') == b'2499'
+    assert redis_store.ttl('key0') > 0
@@ -1,3 +1,5 @@
+import types
+
 import pymongo
 import pytest
 
@@ -95,3 +97,48 @@ def test_sharded_collection(mongodb, pytestconfig):
     mongodb.sharded_collection.insert({'_id': 'foo', '_shard_id': 0})
     with pytest.raises(pymongo.errors.WriteError):
         mongodb.sharded_collection.insert({'_id': 'bar'})
+
+
+def test_settings_fingerprint():
+    settings = {
+        'indexes': [{'key': 'field', 'unique': True}],
+        'sharding': {'key': '_shard_id'},
+    }
+    fingerprint = ensure_db_indexes.get_settings_fingerprint(settings)
+    assert fingerprint == ensure_db_indexes.get_settings_fingerprint(
+        {'sharding': {'key': '_shard_id'}, 'indexes': settings['indexes']},
+    )
+    assert fingerprint != ensure_db_indexes.get_settings_fingerprint(
+        {'indexes': [{'key': 'field'}], 'sharding': settings['sharding']},
+    )
+    assert fingerprint != ensure_db_indexes.get_settings_fingerprint(
+        settings, sharding_enabled=False
+    )
+
+
+def test_sharding_enabled_once_per_database(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        ensure_db_indexes,
+        'enable_sharding',
+        lambda database: calls.append(('enable', database.name)),
+    )
+    monkeypatch.setattr(
+        ensure_db_indexes,
+        '_ensure_collection',
+        lambda collection, alias, *args: calls.append(('ensure', alias)),
+    )
+    database = types.SimpleNamespace(name='db')
+    dbase = types.SimpleNamespace(
+        foo=types.SimpleNamespace(database=database),
+        bar=types.SimpleNamespace(database=database),
+    )
+    sharding = {'sharding': {'key': '_shard_id'}}
+    ensure_db_indexes.ensure_db_indexes(
+        dbase, {'foo': sharding, 'bar': sharding, 'missing': sharding}
+    )
+    assert calls == [
+        ('enable', 'db'),
+        ('ensure', 'foo'),
+        ('ensure', 'bar'),
+    ]
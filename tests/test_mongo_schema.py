@@ -0,0 +1,46 @@
+import os
+
+from testsuite.databases.mongo import mongo_schema
+from testsuite.utils import yaml_util
+
+
+def test_schemas_registry_built_once(tmp_path):
+    tmp_path.joinpath('foo.yaml').write_text('settings: {}\n')
+    cache = mongo_schema.MongoSchemaCache()
+    schemas = cache.get_schemas([tmp_path])
+    assert list(schemas) == ['foo']
+    assert cache.get_schemas([str(tmp_path)]) is schemas
+
+
+def test_parsed_schemas_persisted(tmp_path, monkeypatch):
+    schema_dir = tmp_path.joinpath('schemas')
+    schema_dir.mkdir()
+    schema_path = schema_dir.joinpath('foo.yaml')
+    schema_path.write_text('settings:\n  collection: foo\n')
+    # Recently modified files are not cached
+    os.utime(schema_path, ns=(0, 0))
+    cache_path = tmp_path.joinpath('cache.json')
+
+    loaded = []
+    load_file = yaml_util.load_file
+
+    def _load_file(path, *args, **kwargs):
+        loaded.append(path.name)
+        return load_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(yaml_util, 'load_file', _load_file)
+
+    for _ in range(2):
+        cache = mongo_schema.MongoSchemaCache(cache_path)
+        schemas = cache.get_schemas([schema_dir])
+        assert schemas['foo'] == {'settings': {'collection': 'foo'}}
+        cache.save()
+    assert loaded == ['foo.yaml']
+
+    schema_path.write_text('settings:\n  collection: bar\n')
+    os.utime(schema_path, ns=(10**9, 10**9))
+    cache = mongo_schema.MongoSchemaCache(cache_path)
+    assert cache.get_schemas([schema_dir])['foo'] == {
+        'settings': {'collection': 'bar'},
+    }
+    assert loaded == ['foo.yaml', 'foo.yaml']
@@ -0,0 +1,43 @@
+import datetime
+import os
+
+from testsuite.utils import files_cache
+
+
+def test_values_persisted(tmp_path):
+    path = tmp_path.joinpath('file')
+    path.write_text('foo')
+    os.utime(path, ns=(0, 0))
+    cache_path = tmp_path.joinpath('cache.json')
+
+    cache = files_cache.FilesCache(cache_path)
+    assert cache.get(path, lambda path: {'value': path.read_text()}) == {
+        'value': 'foo',
+    }
+    cache.save()
+
+    cache = files_cache.FilesCache(cache_path)
+    assert cache.get(path, lambda path: None) == {'value': 'foo'}
+
+
+def test_not_serializable_value_not_cached(tmp_path):
+    path = tmp_path.joinpath('file')
+    path.write_text('foo')
+    os.utime(path, ns=(0, 0))
+    cache_path = tmp_path.joinpath('cache.json')
+
+    cache = files_cache.FilesCache(cache_path)
+    for value in ({1: 'foo'}, datetime.date(2020, 1, 1)):
+        assert cache.get(path, lambda path: value) == value
+    cache.save()
+    assert not cache_path.exists()
+
+
+def test_broken_cache_file_ignored(tmp_path):
+    path = tmp_path.joinpath('file')
+    path.write_text('foo')
+    cache_path = tmp_path.joinpath('cache.json')
+    cache_path.write_text('[1, 2')
+
+    cache = files_cache.FilesCache(cache_path)
+    assert cache.get(path, lambda path: path.read_text()) == 'foo'
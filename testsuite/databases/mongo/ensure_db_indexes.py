@@ -1,8 +1,13 @@
+import hashlib
+import json
 import typing
 
 import pymongo
 import pytest
 
+FINGERPRINTS_DATABASE = 'testsuite'
+FINGERPRINTS_COLLECTION = 'ensured_indexes'
+
 SORT_STR_TO_PYMONGO = {
     'ascending': pymongo.ASCENDING,
     'descending': pymongo.DESCENDING,
@@ -20,54 +25,130 @@ def create_collection(collection):
         pass
 
 
-def shard_collection(collection, sharding):
-    db_admin = collection.database.client.admin
+def enable_sharding(database):
     try:
-        db_admin.command('enablesharding', collection.database.name)
+        database.client.admin.command('enablesharding', database.name)
     except pymongo.errors.OperationFailure as exc:
         if exc.code != 23:
             raise
+
+
+def shard_collection(collection, sharding, *, enable=True):
+    db_admin = collection.database.client.admin
+    if enable:
+        enable_sharding(collection.database)
     kwargs = _get_kwargs_for_shard_func(sharding)
     if not _is_collection_sharded(collection):
         db_admin.command('shardcollection', collection.full_name, **kwargs)
 
 
-def ensure_db_indexes(dbase, db_settings, sharding_enabled=True):
-    for alias, value in db_settings.items():
+def ensure_db_indexes(dbase, db_settings, sharding_enabled=True, map_func=map):
+    """Create collections, their indexes and sharding.
+
+    Collections are processed with ``map_func``, e.g. thread pool ``map``.
+    Fingerprint of collection settings is stored in the database, so that
+    collections already set up with the same settings, e.g. by previous
+    session with reused services, are skipped. Sharding is enabled once per
+    database beforehand, concurrent ``enablesharding`` calls may conflict.
+    """
+    collections = {}
+    for alias in db_settings:
         collection = getattr(dbase, alias, None)
         if collection is not None:
-            create_collection(collection)
-
-            indexes = value.get('indexes')
-            if indexes:
-                for index in indexes:
-                    _ensure_index(index, collection)
-                index_info = collection.index_information()
-                assert len(index_info) == len(indexes) + 1, (
-                    'Collection {} have {} indexes, but must have {} '.format(
-                        alias,
-                        len(index_info),
-                        len(indexes) + 1,
-                    )
-                )
-
-            if sharding_enabled:
-                sharding = value.get('sharding')
-                if sharding:
-                    shard_collection(collection, sharding)
-
-
-def _ensure_index(index, collection):
-    arg, kwargs = _get_args_for_ensure_func(index)
-    kwargs.pop('expireAfterSeconds', None)
+            collections[alias] = collection
+
+    if sharding_enabled:
+        databases = {
+            collection.database.name: collection.database
+            for alias, collection in collections.items()
+            if db_settings[alias].get('sharding')
+        }
+        for database in databases.values():
+            enable_sharding(database)
+
+    def ensure(item):
+        alias, collection = item
+        _ensure_collection(
+            collection, alias, db_settings[alias], sharding_enabled
+        )
+
+    list(map_func(ensure, collections.items()))
+
+
+def get_settings_fingerprint(settings, sharding_enabled=True) -> str:
+    spec = {'indexes': settings.get('indexes') or []}
+    if sharding_enabled:
+        spec['sharding'] = settings.get('sharding')
+    dumped = json.dumps(spec, sort_keys=True, default=str)
+    return hashlib.sha1(dumped.encode('utf-8')).hexdigest()
+
+
+def _ensure_collection(collection, alias, settings, sharding_enabled):
+    fingerprints = collection.database.client[FINGERPRINTS_DATABASE][
+        FINGERPRINTS_COLLECTION
+    ]
+    fingerprint = get_settings_fingerprint(settings, sharding_enabled)
+    stored = fingerprints.find_one({'_id': collection.full_name})
+    uuid = _get_collection_uuid(collection)
+    if (
+        stored
+        and uuid is not None
+        and stored.get('fingerprint') == fingerprint
+        and stored.get('uuid') == uuid
+    ):
+        return
+
+    create_collection(collection)
+
+    indexes = settings.get('indexes')
+    if indexes:
+        _ensure_indexes(indexes, collection)
+        index_info = collection.index_information()
+        assert len(index_info) == len(indexes) + 1, (
+            'Collection {} have {} indexes, but must have {} '.format(
+                alias,
+                len(index_info),
+                len(indexes) + 1,
+            )
+        )
+
+    if sharding_enabled:
+        sharding = settings.get('sharding')
+        if sharding:
+            shard_collection(collection, sharding, enable=False)
+
+    fingerprints.replace_one(
+        {'_id': collection.full_name},
+        {
+            'fingerprint': fingerprint,
+            'uuid': _get_collection_uuid(collection),
+        },
+        upsert=True,
+    )
+
+
+def _ensure_indexes(indexes, collection):
+    models = []
+    for index in indexes:
+        arg, kwargs = _get_args_for_ensure_func(index)
+        kwargs.pop('expireAfterSeconds', None)
+        models.append(pymongo.IndexModel(arg, **kwargs))
     try:
-        collection.create_index(arg, **kwargs)
+        collection.create_indexes(models)
     except pymongo.errors.OperationFailure as exc:
         pytest.fail(
             'ensure_index() failed for %s: %s' % (collection.name, exc),
         )
 
 
+def _get_collection_uuid(collection):
+    for info in collection.database.list_collections(
+        filter={'name': collection.name}
+    ):
+        return info.get('info', {}).get('uuid')
+    return None
+
+
 def _get_args_for_ensure_func(index):
     kwargs = {}
     for key, value in index.items():
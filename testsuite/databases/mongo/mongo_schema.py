@@ -3,7 +3,14 @@ import pathlib
 import typing
 
 from testsuite import annotations
-from testsuite.utils import yaml_util
+from testsuite.utils import files_cache, yaml_util
+
+
+class SchemaFilesCache(files_cache.FilesCache):
+    """Parsed schema files persisted between sessions."""
+
+    def load_file(self, path: pathlib.Path) -> typing.Dict:
+        return self.get(path, yaml_util.load_file)
 
 
 class MongoSchema(collections.abc.Mapping):
@@ -11,8 +18,13 @@ class MongoSchema(collections.abc.Mapping):
     _loaded: typing.Dict[str, typing.Dict]
     _paths: typing.Dict[str, pathlib.Path]
 
-    def __init__(self, directory: annotations.PathOrStr) -> None:
+    def __init__(
+        self,
+        directory: annotations.PathOrStr,
+        files_cache: typing.Optional[SchemaFilesCache] = None,
+    ) -> None:
         self._directory = pathlib.Path(directory)
+        self._files_cache = files_cache or SchemaFilesCache()
         self._loaded = {}
         self._paths = _get_paths(self._directory)
 
@@ -20,7 +32,7 @@ class MongoSchema(collections.abc.Mapping):
         if name not in self._paths:
             raise KeyError(f'Missing schema file for collection {name}')
         if name not in self._loaded:
-            self._loaded[name] = yaml_util.load_file(self._paths[name])
+            self._loaded[name] = self._files_cache.load_file(self._paths[name])
         return self._loaded[name]
 
     def __iter__(self) -> typing.Iterator[str]:
@@ -35,15 +47,34 @@ class MongoSchema(collections.abc.Mapping):
 
 
 class MongoSchemaCache:
-    def __init__(self) -> None:
+    def __init__(
+        self, cache_path: typing.Optional[pathlib.Path] = None
+    ) -> None:
         self._cache: typing.Dict[pathlib.Path, MongoSchema] = {}
+        self._schemas: typing.Dict[
+            typing.Tuple[pathlib.Path, ...], MongoSchemas
+        ] = {}
+        self._files_cache = SchemaFilesCache(cache_path)
 
     def get_schema(self, directory: annotations.PathOrStr) -> MongoSchema:
         directory = pathlib.Path(directory)
         if directory not in self._cache:
-            self._cache[directory] = MongoSchema(directory)
+            self._cache[directory] = MongoSchema(directory, self._files_cache)
         return self._cache[directory]
 
+    def get_schemas(
+        self, directories: typing.Iterable[annotations.PathOrStr]
+    ) -> 'MongoSchemas':
+        """Returns schemas registry, it is built once for directories list."""
+        key = tuple(pathlib.Path(directory) for directory in directories)
+        if key not in self._schemas:
+            self._schemas[key] = MongoSchemas(self, key)
+        return self._schemas[key]
+
+    def save(self) -> None:
+        """Persist parsed schema files for the next session."""
+        self._files_cache.save()
+
 
 class MongoSchemas(collections.abc.Mapping):
     def __init__(
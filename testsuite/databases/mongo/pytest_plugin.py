@@ -1,12 +1,18 @@
 import contextlib
 import dataclasses
+import hashlib
+import logging
 import multiprocessing.pool
+import os
 import pathlib
 import pprint
 import random
 import re
+import time
 import typing
 
+import bson
+import bson.raw_bson
 import pymongo
 import pymongo.collection
 import pymongo.errors
@@ -14,11 +20,14 @@ import pytest
 from bson import json_util
 
 from testsuite import annotations, utils
+from testsuite.plugins import object_hook
 
 from . import connection, ensure_db_indexes, mongo_schema, service
 
 # pylint: disable=too-many-statements
 
+logger = logging.getLogger(__name__)
+
 DB_FILE_RE_PATTERN = re.compile(r'^db_(?P<mongo_db_alias>\w+)\.json$')
 JSON_OPTIONS = json_util.JSONOptions(tz_aware=False)
 MONGO_OBJECT_HOOKS = (
@@ -43,6 +52,19 @@ MONGO_OBJECT_HOOKS = (
 )
 
 
+CollectionState = typing.Tuple[typing.Any, ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadedCollection:
+    """Fixture loaded into collection and collection state right after."""
+
+    fixture_hash: str
+    #: Seed documents were shuffled with, ``None`` if not shuffled
+    shuffle_seed: typing.Optional[str]
+    state: CollectionState
+
+
 class BaseError(Exception):
     """Base testsuite error"""
 
@@ -68,10 +90,32 @@ class CollectionWrapper:
     def get_aliases(self) -> typing.Tuple[str]:
         return self._aliases
 
+    def get_collections(
+        self,
+    ) -> typing.Dict[str, pymongo.collection.Collection]:
+        return self._collections.copy()
+
 
 class CollectionWrapperFactory:
+    """Creates collection wrappers, memoized for the session.
+
+    Wrapper of base collections list is built once per list and settings.
+    Extra collections, e.g. added by ``mongodb_collections`` mark, are put
+    over the base wrapper, such overlays are memoized too.
+    """
+
     def __init__(self, connection_info: connection.ConnectionInfo):
         self._connection_info = connection_info
+        self._collections: typing.Dict[
+            typing.Tuple[str, str], pymongo.collection.Collection
+        ] = {}
+        self._base_wrappers: typing.Dict[
+            typing.Tuple[str, ...], typing.Tuple[typing.Any, CollectionWrapper]
+        ] = {}
+        self._overlays: typing.Dict[
+            typing.Tuple[CollectionWrapper, typing.FrozenSet[str]],
+            CollectionWrapper,
+        ] = {}
 
     @property
     def connection_string(self) -> str:
@@ -85,7 +129,35 @@ class CollectionWrapperFactory:
         self,
         collection_names,
         mongodb_settings,
+        extra_names=(),
     ) -> CollectionWrapper:
+        base_key = tuple(collection_names)
+        entry = self._base_wrappers.get(base_key)
+        if entry is not None and entry[0] is mongodb_settings:
+            base = entry[1]
+        else:
+            base = CollectionWrapper(
+                self._get_collections(base_key, mongodb_settings)
+            )
+            self._base_wrappers[base_key] = (mongodb_settings, base)
+
+        extra = frozenset(name for name in extra_names if name not in base)
+        if not extra:
+            return base
+        overlay_key = (base, extra)
+        wrapper = self._overlays.get(overlay_key)
+        if wrapper is None:
+            wrapper = self._overlays[overlay_key] = CollectionWrapper(
+                {
+                    **base.get_collections(),
+                    **self._get_collections(sorted(extra), mongodb_settings),
+                },
+            )
+        return wrapper
+
+    def _get_collections(
+        self, collection_names, mongodb_settings
+    ) -> typing.Dict[str, pymongo.collection.Collection]:
         collections = {}
         for name in collection_names:
             if name not in mongodb_settings:
@@ -94,9 +166,19 @@ class CollectionWrapperFactory:
                 )
             # pylint: disable=unsubscriptable-object
             settings = mongodb_settings[name]['settings']
-            database = self.client[settings['database']]
-            collections[name] = database[settings['collection']]
-        return CollectionWrapper(collections)
+            collections[name] = self._get_collection(
+                settings['database'], settings['collection']
+            )
+        return collections
+
+    def _get_collection(
+        self, database: str, name: str
+    ) -> pymongo.collection.Collection:
+        key = (database, name)
+        collection = self._collections.get(key)
+        if collection is None:
+            collection = self._collections[key] = self.client[database][name]
+        return collection
 
 
 def pytest_configure(config):
@@ -108,6 +190,10 @@ def pytest_configure(config):
         'markers',
         'filldb: specify mongo static file suffix',
     )
+    config.addinivalue_line(
+        'markers',
+        'filldb_snapshot: load mongo fixtures through BSON snapshots',
+    )
     config.addinivalue_line(
         'markers',
         'mongodb_collections: override mongo collections list',
@@ -130,6 +216,15 @@ def pytest_addoption(parser):
         action='store_true',
         help='Disable fixture data shuffle.',
     )
+    group.addoption(
+        '--mongo-shuffle-seed',
+        default='',
+        help=(
+            'Fixture data shuffle seed, combined with collection name and '
+            'fixture content. '
+            'Change to get different documents order.'
+        ),
+    )
     group.addoption(
         '--no-sharding',
         action='store_true',
@@ -149,6 +244,11 @@ def pytest_addoption(parser):
             'string.'
         ),
     )
+    parser.addini(
+        'mongo-fixture-load-threads',
+        default='4',
+        help='Number of threads used to load collection fixtures.',
+    )
 
 
 def pytest_service_register(register_service):
@@ -217,8 +317,7 @@ def mongodb_settings(
     mongo_schema_extra_directories,
     _mongo_schema_cache,
 ) -> mongo_schema.MongoSchemas:
-    return mongo_schema.MongoSchemas(
-        _mongo_schema_cache,
+    return _mongo_schema_cache.get_schemas(
         (mongo_schema_directory, *mongo_schema_extra_directories),
     )
 
@@ -270,6 +369,7 @@ def _mongo_create_indexes(
     pytestconfig,
     _mongo_indexes_ensured,
     _mongo_service,
+    _mongo_thread_pool,
 ) -> None:
     aliases = _mongodb_local.get_aliases()
     if not pytestconfig.option.no_indexes:
@@ -286,26 +386,102 @@ def _mongo_create_indexes(
                 _mongodb_local,
                 _ensure_indexes,
                 sharding_enabled=sharding_enabled,
+                map_func=_mongo_thread_pool.map,
             )
             _mongo_indexes_ensured.update(_ensure_indexes)
 
 
 @pytest.fixture(scope='session')
-def _mongo_thread_pool() -> annotations.YieldFixture[
-    multiprocessing.pool.ThreadPool,
-]:
-    pool = multiprocessing.pool.ThreadPool(processes=1)
+def mongo_fixture_load_threads(pytestconfig) -> int:
+    """Number of collections loaded with fixture data concurrently.
+
+    Defaults to ``mongo-fixture-load-threads`` ini option value.
+    """
+    return int(pytestconfig.getini('mongo-fixture-load-threads'))
+
+
+@pytest.fixture(scope='session')
+def _mongo_thread_pool(
+    mongo_fixture_load_threads,
+) -> annotations.YieldFixture[multiprocessing.pool.ThreadPool]:
+    pool = multiprocessing.pool.ThreadPool(
+        processes=max(mongo_fixture_load_threads, 1)
+    )
     with contextlib.closing(pool):
         yield pool
 
 
+@pytest.fixture(scope='session')
+def _mongo_loaded_collections() -> typing.Dict[str, LoadedCollection]:
+    return {}
+
+
+@pytest.fixture(scope='session')
+def _mongo_fixture_cache(_base_object_hook) -> object_hook.ParsedFilesCache:
+    return object_hook.ParsedFilesCache(_base_object_hook())
+
+
 @pytest.fixture
-def _mongo_query_loader(load_json):
+def _mongo_query_loader(get_file_path, load_json, _mongo_fixture_cache):
+    """Load fixture documents, parsed files are cached for the session.
+
+    Loader returns fixture content hash and documents. Documents are stored
+    BSON-encoded, so they are not copied and can be inserted as is.
+    Documents without ``_id`` are kept as dicts and copied as ``_id`` is
+    added to them on insert. Files using per-test object hooks, e.g.
+    ``$dateDiff`` depending on mocked time, are parsed every time.
+    """
+
+    def parse(filename):
+        docs = _encode_fixture_docs(load_json(filename) or [])
+        return _get_fixture_hash(docs), docs
+
     def loader(filename, missing_ok=False):
-        data = load_json(filename, missing_ok=missing_ok)
-        if data is None:
-            return []
-        return data
+        path = get_file_path(filename, missing_ok=missing_ok)
+        if path is None:
+            return _get_fixture_hash([]), []
+        fixture_hash, docs = _mongo_fixture_cache.load(
+            path, lambda: parse(filename)
+        )
+        return fixture_hash, _copy_fixture_docs(docs)
+
+    return loader
+
+
+@pytest.fixture
+def _mongo_snapshot_loader(
+    get_file_path, load_json, _mongo_fixture_cache, testsuite_env_dir
+):
+    """Load fixture documents through BSON snapshot of fixture file.
+
+    Snapshot is built once per fixture file content and stored in mongodump
+    ``.bson`` format, documents without ``_id`` get one assigned then.
+    Loader returns content hash and function reading documents, so that
+    snapshot is not read if collection is up to date.
+    """
+    snapshots_dir = testsuite_env_dir.joinpath('mongo-snapshots')
+
+    def loader(filename, missing_ok=False):
+        path = get_file_path(filename, missing_ok=missing_ok)
+        if path is None:
+            return _get_fixture_hash([]), list
+        content = path.read_bytes()
+        if _mongo_fixture_cache.has_per_test_hooks(content.decode()):
+            docs = load_json(filename) or []
+            return _get_fixture_hash(docs), lambda: docs
+
+        content_hash = hashlib.sha1(content).hexdigest()
+        path_hash = hashlib.sha1(str(path).encode('utf-8')).hexdigest()
+        snapshot_path = snapshots_dir.joinpath(
+            f'{path_hash}-{content_hash}.bson'
+        )
+
+        def load_docs():
+            if not snapshot_path.exists():
+                _write_snapshot(snapshot_path, load_json(filename) or [])
+            return _read_snapshot(snapshot_path)
+
+        return f'snapshot:{content_hash}', load_docs
 
     return loader
 
@@ -319,8 +495,22 @@ def mongodb_init(
     _mongo_thread_pool,
     _mongo_create_indexes,
     _mongo_query_loader,
+    _mongo_snapshot_loader,
+    _mongo_loaded_collections,
 ) -> None:
-    """Populate mongodb with fixture data."""
+    """Populate mongodb with fixture data.
+
+    Collection is not reloaded if it holds the same fixture in the same
+    order as after the previous load and there were no writes to it since
+    then.
+
+    Collections are loaded concurrently, documents within collection are
+    inserted in order. Unless disabled documents are shuffled with random
+    generator seeded by collection name and fixture content, so order is
+    reproducible and collections can be reused between tests. With
+    ``filldb_snapshot`` mark documents are restored from BSON snapshots
+    instead of parsing fixture files.
+    """
 
     if request.node.get_closest_marker('nofilldb'):
         return
@@ -332,6 +522,7 @@ def mongodb_init(
     )
     aliases = {key: key for key in _mongodb_local.get_aliases()}
     requested = set()
+    snapshot = request.node.get_closest_marker('filldb_snapshot') is not None
 
     for marker in request.node.iter_markers('filldb'):
         for dbname, alias in marker.kwargs.items():
@@ -355,6 +546,15 @@ def mongodb_init(
                 return False
         return True
 
+    shuffle_seed = request.config.option.mongo_shuffle_seed
+    if shuffle_enabled:
+        request.node.add_report_section(
+            'setup',
+            'mongodb shuffle',
+            f'Fixture documents shuffled with --mongo-shuffle-seed='
+            f'{shuffle_seed!r}, collection name and fixture content',
+        )
+
     verify_file_paths(
         _verify_db_alias,
         check_name='mongo_db_aliases',
@@ -369,29 +569,65 @@ def mongodb_init(
         except AttributeError:
             return
 
-        docs = _mongo_query_loader(
-            f'db_{alias}.json', missing_ok=dbname not in requested
+        started = time.perf_counter()
+        _fill_collection(col, alias, dbname in requested)
+        logger.debug(
+            'Mongo collection %s filled in %.3fs',
+            col.full_name,
+            time.perf_counter() - started,
         )
 
-        if not docs and col.find_one({}, []) is None:
-            return
-
+    def _fill_collection(col, alias, is_requested):
+        filename = f'db_{alias}.json'
+        if snapshot:
+            fixture_hash, load_docs = _mongo_snapshot_loader(
+                filename, missing_ok=not is_requested
+            )
+        else:
+            fixture_hash, docs = _mongo_query_loader(
+                filename, missing_ok=not is_requested
+            )
+        collection_seed = None
         if shuffle_enabled:
-            # Make sure there is no tests that depend on order of
-            # documents in fixture file.
-            random.shuffle(docs)
+            collection_seed = f'{shuffle_seed}:{col.full_name}:{fixture_hash}'
+        loaded = _mongo_loaded_collections.pop(col.full_name, None)
+        if (
+            loaded
+            and loaded.fixture_hash == fixture_hash
+            and loaded.shuffle_seed == collection_seed
+            and loaded.state == _get_collection_state(col)
+        ):
+            _mongo_loaded_collections[col.full_name] = loaded
+            return
 
-        try:
-            col.bulk_write(
-                [
-                    pymongo.DeleteMany({}),
-                    *(pymongo.InsertOne(doc) for doc in docs),
-                ],
-                ordered=True,
+        if snapshot:
+            docs = load_docs()
+        if docs or col.find_one({}, []) is not None:
+            order = list(range(len(docs)))
+            if collection_seed is not None:
+                # Make sure there is no tests that depend on order of
+                # documents in fixture file.
+                random.Random(collection_seed).shuffle(order)
+
+            try:
+                col.bulk_write(
+                    [
+                        pymongo.DeleteMany({}),
+                        *(pymongo.InsertOne(docs[index]) for index in order),
+                    ],
+                    ordered=True,
+                )
+            except pymongo.errors.BulkWriteError as bwe:
+                pprint.pprint(bwe.details)
+                raise
+
+        state = _get_collection_state(col)
+        if state is not None:
+            _mongo_loaded_collections[col.full_name] = LoadedCollection(
+                fixture_hash=fixture_hash,
+                shuffle_seed=collection_seed,
+                state=state,
             )
-        except pymongo.errors.BulkWriteError as bwe:
-            pprint.pprint(bwe.details)
-            raise
 
     pool_args = []
     for dbname, alias in aliases.items():
@@ -402,13 +638,19 @@ def mongodb_init(
 
 @pytest.fixture
 def _mongodb_local(
+    request,
     mongodb_settings,
-    _mongo_local_collections,
+    mongodb_collections,
     _mongo_collection_wrapper_factory: CollectionWrapperFactory,
 ) -> CollectionWrapper:
     return _mongo_collection_wrapper_factory.create_collection_wrapper(
-        _mongo_local_collections,
+        mongodb_collections,
         mongodb_settings,
+        extra_names=[
+            name
+            for marker in request.node.iter_markers('mongodb_collections')
+            for name in marker.args
+        ],
     )
 
 
@@ -428,8 +670,14 @@ def _mongo_local_collections(request, mongodb_collections) -> typing.Set[str]:
 
 
 @pytest.fixture(scope='session')
-def _mongo_schema_cache() -> mongo_schema.MongoSchemaCache:
-    return mongo_schema.MongoSchemaCache()
+def _mongo_schema_cache(
+    testsuite_env_dir,
+) -> annotations.YieldFixture[mongo_schema.MongoSchemaCache]:
+    cache = mongo_schema.MongoSchemaCache(
+        testsuite_env_dir.joinpath('mongo-schema-cache.json'),
+    )
+    yield cache
+    cache.save()
 
 
 @pytest.fixture(scope='session')
@@ -441,6 +689,90 @@ def _mongo_service_settings(
     return service.get_service_settings()
 
 
+def _write_snapshot(path: pathlib.Path, docs: typing.List[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Snapshots of previous file contents are not needed anymore
+    prefix = path.name.split('-', 1)[0]
+    for stale_path in path.parent.glob(f'{prefix}-*.bson'):
+        if stale_path != path:
+            with contextlib.suppress(FileNotFoundError):
+                stale_path.unlink()
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}')
+    with tmp_path.open('wb') as snapshot_file:
+        for doc in docs:
+            doc.setdefault('_id', bson.ObjectId())
+            snapshot_file.write(bson.encode(doc))
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot(
+    path: pathlib.Path,
+) -> typing.List[bson.raw_bson.RawBSONDocument]:
+    with path.open('rb') as snapshot_file:
+        return list(
+            bson.decode_file_iter(
+                snapshot_file,
+                codec_options=bson.raw_bson.DEFAULT_RAW_BSON_OPTIONS,
+            ),
+        )
+
+
+def _encode_fixture_docs(
+    data: typing.List[dict],
+) -> typing.Tuple[typing.Mapping, ...]:
+    return tuple(
+        bson.raw_bson.RawBSONDocument(bson.encode(doc)) if '_id' in doc else doc
+        for doc in data
+    )
+
+
+def _copy_fixture_docs(
+    docs: typing.Sequence[typing.Mapping],
+) -> typing.Sequence[typing.Mapping]:
+    """Returns documents safe to insert, immutable documents are shared."""
+    if all(isinstance(doc, bson.raw_bson.RawBSONDocument) for doc in docs):
+        return docs
+    return [
+        doc if isinstance(doc, bson.raw_bson.RawBSONDocument) else dict(doc)
+        for doc in docs
+    ]
+
+
+def _get_fixture_hash(docs: typing.Sequence[typing.Mapping]) -> str:
+    fixture_hash = hashlib.sha1()
+    for doc in docs:
+        fixture_hash.update(bson.encode(doc))
+    return fixture_hash.hexdigest()
+
+
+def _get_collection_state(
+    col: pymongo.collection.Collection,
+) -> typing.Optional[CollectionState]:
+    """Returns value changed by any write to collection.
+
+    Per-shard write operation counters and documents count are used together
+    with collection UUID, that changes if collection is dropped and created
+    anew. ``None`` is returned if server does not provide the stats.
+    """
+    try:
+        stats = col.aggregate(
+            [{'$collStats': {'latencyStats': {}, 'count': {}}}],
+        )
+        counters = sorted(
+            (
+                entry.get('shard', ''),
+                entry['latencyStats']['writes']['ops'],
+                entry.get('count'),
+            )
+            for entry in stats
+        )
+        infos = col.database.list_collections(filter={'name': col.name})
+        uuids = [info.get('info', {}).get('uuid') for info in infos]
+    except (pymongo.errors.OperationFailure, KeyError):
+        return None
+    return (tuple(uuids), tuple(counters))
+
+
 def _is_relevant_file(
     request,
     static_dir: pathlib.Path,
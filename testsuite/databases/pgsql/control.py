@@ -1,20 +1,35 @@
+import asyncio
 import concurrent.futures
 import contextlib
 import dataclasses
+import hashlib
+import io
 import logging
 import pathlib
+import re
+import threading
 import time
 import typing
 import warnings
 
 import psycopg2
+import psycopg2.errorcodes
 import psycopg2.extensions
 import psycopg2.extras
 
 from testsuite import utils as testsuite_utils
 from testsuite.environment import shell
 
-from . import connection, discover, exceptions, pool, service, testsuite_db
+from . import (
+    connection,
+    discover,
+    exceptions,
+    migrate,
+    pool,
+    service,
+    testsuite_db,
+    utils,
+)
 from .exceptions import __tracebackhide__
 
 logger = logging.getLogger(__name__)
@@ -24,6 +39,14 @@ CREATE DATABASE "{}" WITH TEMPLATE = template0
 ENCODING='UTF8' LC_COLLATE='C' LC_CTYPE='C'
 """
 DROP_DATABASE_TEMPLATE = 'DROP DATABASE IF EXISTS "{}"'
+CREATE_DATABASE_FROM_SNAPSHOT_TEMPLATE = (
+    'CREATE DATABASE "{dbname}" WITH TEMPLATE = "{template}"'
+)
+RENAME_DATABASE_TEMPLATE = 'ALTER DATABASE "{}" RENAME TO "{}"'
+TERMINATE_BACKENDS_SQL = """
+SELECT pg_terminate_backend(pid) FROM pg_stat_activity
+WHERE datname = %s AND pid != pg_backend_pid()
+"""
 LIST_TABLES_SQL = """
 SELECT CONCAT(table_schema, '.', table_name)
 FROM information_schema.tables
@@ -31,10 +54,64 @@ WHERE table_schema != 'information_schema' AND
 table_schema != 'pg_catalog' AND table_type = 'BASE TABLE'
 ORDER BY table_schema,table_name
 """
+LIST_FOREIGN_KEYS_SQL = """
+SELECT
+    CONCAT(referencing_ns.nspname, '.', referencing.relname),
+    CONCAT(referenced_ns.nspname, '.', referenced.relname)
+FROM pg_constraint
+JOIN pg_class referencing ON referencing.oid = pg_constraint.conrelid
+JOIN pg_namespace referencing_ns ON referencing_ns.oid = referencing.relnamespace
+JOIN pg_class referenced ON referenced.oid = pg_constraint.confrelid
+JOIN pg_namespace referenced_ns ON referenced_ns.oid = referenced.relnamespace
+WHERE pg_constraint.contype = 'f'
+"""
+LIST_OWNED_SEQUENCES_SQL = """
+SELECT
+    CONCAT(table_ns.nspname, '.', table_class.relname),
+    CONCAT(sequence_ns.nspname, '.', sequence_class.relname)
+FROM pg_depend
+JOIN pg_class sequence_class ON sequence_class.oid = pg_depend.objid
+JOIN pg_namespace sequence_ns ON sequence_ns.oid = sequence_class.relnamespace
+JOIN pg_class table_class ON table_class.oid = pg_depend.refobjid
+JOIN pg_namespace table_ns ON table_ns.oid = table_class.relnamespace
+WHERE pg_depend.classid = 'pg_class'::regclass AND
+pg_depend.refclassid = 'pg_class'::regclass AND
+pg_depend.deptype IN ('a', 'i') AND sequence_class.relkind = 'S'
+"""
+MODIFIED_TABLE_SQL_TEMPLATE = 'SELECT %s WHERE EXISTS (SELECT 1 FROM {table})'
+USED_SEQUENCE_SQL_TEMPLATE = '(SELECT is_called FROM {sequence})'
 
 TRUNCATE_SQL_TEMPLATE = 'TRUNCATE TABLE {tables} RESTART IDENTITY'
+BATCH_SEPARATOR = '\n;\n'
 TRUNCATE_RETRIES = 5
 TRUNCATE_RETRY_DELAY = 0.005
+TRUNCATE_LOCK_TIMEOUT_MS = 1000
+LOCK_TIMEOUT_SQL_TEMPLATE = 'SET LOCAL lock_timeout = {timeout}'
+LIST_BLOCKING_BACKENDS_SQL = """
+SELECT pid, state, application_name, now() - xact_start, query
+FROM pg_stat_activity
+WHERE pid = ANY(pg_blocking_pids(%s))
+ORDER BY pid
+"""
+BLOCKING_BACKENDS_POLL_INTERVAL = 0.01
+TERMINATE_BACKEND_SQL = 'SELECT pg_terminate_backend(%s)'
+IDLE_IN_TRANSACTION_STATES = frozenset(
+    {'idle in transaction', 'idle in transaction (aborted)'},
+)
+SCHEMA_APPLY_WORKERS = 8
+PSQL_META_COMMAND_RE = re.compile(r'^\s*\\', re.MULTILINE)
+DOLLAR_QUOTED_RE = re.compile(r'\$(\w*)\$.*?\$\1\$', re.DOTALL)
+TRANSACTION_CONTROL_RE = re.compile(
+    r'(?:^|;)\s*(?:BEGIN|COMMIT|ROLLBACK|ABORT|END|START\s+TRANSACTION'
+    r'|SAVEPOINT|RELEASE|PREPARE\s+TRANSACTION)\b',
+    re.MULTILINE | re.IGNORECASE,
+)
+SNAPSHOT_PREFIX = 'tssnap_'
+SNAPSHOT_SPARE_SUFFIX = '_spare'
+SNAPSHOT_RETRIES = 10
+SNAPSHOT_RETRY_DELAY = 0.05
+WORKER_TEMPLATE_SUFFIX = '_tstemplate'
+PGMIGRATE_VERSION_TABLE = 'public.schema_version'
 
 
 class BaseError(Exception):
@@ -52,18 +129,45 @@ class PgQuery:
     path: typing.Optional[str]
 
 
+@dataclasses.dataclass(frozen=True)
+class PgCopyQuery:
+    """Bulk data load, ``body`` is ``COPY ... FROM STDIN`` statement."""
+
+    body: str
+    data: str
+    source: str
+    path: typing.Optional[str]
+
+
+AnyPgQuery = typing.Union[PgQuery, PgCopyQuery]
+_T = typing.TypeVar('_T')
+
+
 class ConnectionWrapper:
-    def __init__(self, conninfo: connection.PgConnectionInfo):
+    def __init__(
+        self,
+        conninfo: connection.PgConnectionInfo,
+        connection_manager: typing.Optional[pool.ConnectionManager] = None,
+    ):
+        if connection_manager is None:
+            connection_manager = pool.ConnectionManager()
         self._initialized = False
         self._conninfo = conninfo
+        self._connection_manager = connection_manager
         self._conn: typing.Optional[psycopg2.extensions.connection] = None
         self._tables: typing.Optional[typing.List[str]] = None
+        self._modified_tables_sql: typing.Optional[str] = None
+        self._referencing_tables: typing.Dict[str, typing.Set[str]] = {}
         self._truncate_thread: typing.Optional[
-            concurrent.futures.Future[None]
+            concurrent.futures.Future[typing.Optional[typing.List[AnyPgQuery]]]
         ] = None
         self._executer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
 
-    def initialize(self, cleanup_exclude_tables: typing.FrozenSet[str]):
+    def initialize(
+        self,
+        cleanup_exclude_tables: typing.FrozenSet[str],
+        truncate_modified_only: bool = False,
+    ):
         if self._initialized:
             return
         cursor = self.conn.cursor()
@@ -74,6 +178,9 @@ class ConnectionWrapper:
                 for table in cursor
                 if table[0] not in cleanup_exclude_tables
             ]
+            if truncate_modified_only and self._tables:
+                self._init_modified_tables_tracking(cursor)
+        self._connection_manager.prewarm(self._conninfo)
 
         self._initialized = True
 
@@ -93,11 +200,10 @@ class ConnectionWrapper:
                     self.conninfo.get_uri(),
                 ),
             )
+            self._connection_manager.putconn(self._conninfo, self._conn)
             self._conn = None
         if not self._conn:
-            self._conn = psycopg2.connect(self.conninfo.get_uri())
-            # TODO: remove autocommit, see TAXIDATA-2467
-            self._conn.autocommit = True
+            self._conn = self._connection_manager.getconn(self._conninfo)
         return self._conn
 
     def cursor(self, **kwargs) -> psycopg2.extensions.cursor:
@@ -112,51 +218,320 @@ class ConnectionWrapper:
         kwargs['cursor_factory'] = psycopg2.extras.DictCursor
         return self.cursor(**kwargs)
 
-    def apply_queries(self, queries: typing.Iterable[PgQuery]) -> None:
-        """Apply queries to database"""
+    def apply_queries(self, queries: typing.Iterable[AnyPgQuery]) -> None:
+        """Apply queries to database
+
+        Truncation and queries are sent as a single multi-statement query
+        that runs in one transaction. If it fails, the transaction is rolled
+        back and queries are applied one by one to find the erroneous one.
+        Nothing is done if the same queries were preloaded in background.
+        """
+        queries = list(queries)
         cursor = self.cursor()
         with contextlib.closing(cursor):
+            truncate_sql = None
             if self._truncate_thread:
-                self._truncate_thread.result()
+                preloaded_queries = self._truncate_thread.result()
                 self._truncate_thread = None
+                if preloaded_queries == queries:
+                    return
+                if preloaded_queries is not None:
+                    truncate_sql = self._retry_on_lock_errors(
+                        cursor, lambda: self._get_truncate_sql(cursor)
+                    )
             else:
+                truncate_sql = self._retry_on_lock_errors(
+                    cursor, lambda: self._get_truncate_sql(cursor)
+                )
+            if not queries and not truncate_sql:
+                return
+            applied = self._retry_on_lock_errors(
+                cursor, lambda: self._apply(cursor, truncate_sql, queries)
+            )
+            if applied:
+                return
+            if truncate_sql:
                 self._try_truncate_tables(cursor)
             for query in queries:
                 self._apply_query(cursor, query)
 
     def close(self):
         self._executer.shutdown()
+        if self._conn:
+            self._connection_manager.putconn(self._conninfo, self._conn)
+            self._conn = None
+
+    def disconnect(self) -> None:
+        """Wait for pending truncation and close database connection."""
+        if self._truncate_thread:
+            self._truncate_thread.result()
+            self._truncate_thread = None
+        if self._conn:
+            self._conn.close()
+            self._connection_manager.putconn(self._conninfo, self._conn)
+            self._conn = None
+
+    def submit(
+        self, func: typing.Callable[[], _T]
+    ) -> concurrent.futures.Future[_T]:
+        """Run ``func`` in database thread, calls are run one by one."""
+        return self._executer.submit(func)
+
+    def schedule_truncation(
+        self, next_queries: typing.Optional[typing.List[AnyPgQuery]] = None
+    ):
+        """Truncate tables in background.
+
+        :param next_queries: queries expected to be applied next, they are
+            preloaded right after truncation.
+        """
 
-    def schedule_truncation(self):
         def truncate():
             cursor = self.cursor()
             with contextlib.closing(cursor):
                 self._try_truncate_tables(cursor)
+                if not next_queries:
+                    return None
+                applied = self._retry_on_lock_errors(
+                    cursor, lambda: self._apply(cursor, None, next_queries)
+                )
+                return next_queries if applied else None
 
         assert not self._truncate_thread
         self._truncate_thread = self._executer.submit(truncate)
 
     def _try_truncate_tables(self, cursor) -> None:
-        for _ in range(TRUNCATE_RETRIES):
+        self._retry_on_lock_errors(
+            cursor, lambda: self._truncate_tables(cursor)
+        )
+
+    def _retry_on_lock_errors(
+        self, cursor, func: typing.Callable[[], _T]
+    ) -> _T:
+        """Run ``func`` retrying on deadlocks and lock timeouts.
+
+        Retries are watched for backends blocking the cursor connection,
+        they are reported on contention. Idle in transaction blockers never
+        release their locks, so they are terminated before the next attempt.
+        """
+        delay = TRUNCATE_RETRY_DELAY
+        pid = cursor.connection.get_backend_pid()
+        for attempt in range(TRUNCATE_RETRIES + 1):
+            watcher: typing.ContextManager[typing.Dict[int, typing.Tuple]]
+            if attempt:
+                watcher = self._watch_blocking_backends(pid)
+            else:
+                watcher = contextlib.nullcontext({})
             try:
-                self._truncate_tables(cursor)
-                break
-            except psycopg2.extensions.TransactionRollbackError as exc:
-                logger.warning('Truncate table failed: %r', exc)
-                time.sleep(TRUNCATE_RETRY_DELAY)
-        else:
-            self._truncate_tables(cursor)
+                with watcher as blocking_backends:
+                    return func()
+            except psycopg2.OperationalError as exc:
+                if not _is_lock_error(exc):
+                    raise
+                blockers = list(blocking_backends.values())
+                if attempt == TRUNCATE_RETRIES:
+                    raise exceptions.PostgresqlError(
+                        f'Failed to acquire table locks in database '
+                        f'{self._conninfo.dbname!r}: {exc}\n'
+                        f'Blocking backends:\n'
+                        + _format_lock_holders(blockers),
+                    ) from None
+                logger.warning(
+                    'Failed to acquire table locks: %r, blocking backends:\n%s',
+                    exc,
+                    _format_lock_holders(blockers),
+                )
+                for blocker_pid, state, *_ in blockers:
+                    if state in IDLE_IN_TRANSACTION_STATES:
+                        logger.warning(
+                            'Terminating idle in transaction backend %d',
+                            blocker_pid,
+                        )
+                        cursor.execute(TERMINATE_BACKEND_SQL, (blocker_pid,))
+                time.sleep(delay)
+                delay *= 2
+        raise AssertionError('unreachable')
+
+    @contextlib.contextmanager
+    def _watch_blocking_backends(
+        self, pid: int
+    ) -> typing.Iterator[typing.Dict[int, typing.Tuple]]:
+        """Collect backends blocking ``pid`` by their pids.
+
+        ``pg_blocking_pids()`` is only known while ``pid`` waits for a lock,
+        so it is polled from a separate connection.
+        """
+        blocking_backends: typing.Dict[int, typing.Tuple] = {}
+        stopped = threading.Event()
+        conn = self._connection_manager.getconn(self._conninfo)
+
+        def poll():
+            try:
+                with conn.cursor() as cursor:
+                    while not stopped.is_set():
+                        cursor.execute(LIST_BLOCKING_BACKENDS_SQL, (pid,))
+                        for row in cursor:
+                            blocking_backends[row[0]] = row
+                        stopped.wait(BLOCKING_BACKENDS_POLL_INTERVAL)
+            except psycopg2.Error as exc:
+                logger.warning('Failed to list blocking backends: %r', exc)
+
+        thread = threading.Thread(target=poll, daemon=True)
+        thread.start()
+        try:
+            yield blocking_backends
+        finally:
+            stopped.set()
+            thread.join()
+            self._connection_manager.putconn(self._conninfo, conn)
 
     def _truncate_tables(self, cursor) -> None:
-        if self._tables:
+        truncate_sql = self._get_truncate_sql(cursor)
+        if truncate_sql:
+            cursor.execute(truncate_sql)
+
+    def _get_truncate_sql(self, cursor) -> typing.Optional[str]:
+        """Returns truncation query, it waits for table locks no longer than
+        ``TRUNCATE_LOCK_TIMEOUT_MS``.
+        """
+        lock_timeout_sql = LOCK_TIMEOUT_SQL_TEMPLATE.format(
+            timeout=TRUNCATE_LOCK_TIMEOUT_MS,
+        )
+        tables = self._tables
+        if tables and self._modified_tables_sql:
             cursor.execute(
-                TRUNCATE_SQL_TEMPLATE.format(tables=','.join(self._tables)),
+                lock_timeout_sql + BATCH_SEPARATOR + self._modified_tables_sql,
+                tables,
             )
+            tables = self._with_referencing_tables(row[0] for row in cursor)
+        if not tables:
+            return None
+        return (
+            lock_timeout_sql
+            + BATCH_SEPARATOR
+            + TRUNCATE_SQL_TEMPLATE.format(tables=','.join(tables))
+        )
+
+    def _init_modified_tables_tracking(self, cursor) -> None:
+        """Prepare query listing tables modified since the last truncation.
+
+        Table is considered modified if it has rows or any of its identity
+        sequences was used. Tables referencing modified ones via foreign keys
+        are truncated too, otherwise TRUNCATE fails.
+        """
+        assert self._tables
+        cursor.execute(LIST_FOREIGN_KEYS_SQL)
+        for referencing, referenced in cursor:
+            if referencing != referenced:
+                self._referencing_tables.setdefault(referenced, set()).add(
+                    referencing,
+                )
+
+        cursor.execute(LIST_OWNED_SEQUENCES_SQL)
+        sequences: typing.Dict[str, typing.List[str]] = {}
+        for table, sequence in cursor:
+            sequences.setdefault(table, []).append(sequence)
+
+        subqueries = []
+        for table in self._tables:
+            subquery = MODIFIED_TABLE_SQL_TEMPLATE.format(table=table)
+            for sequence in sequences.get(table, ()):
+                subquery += ' OR ' + USED_SEQUENCE_SQL_TEMPLATE.format(
+                    sequence=sequence,
+                )
+            subqueries.append(subquery)
+        self._modified_tables_sql = ' UNION ALL '.join(subqueries)
+
+    def _with_referencing_tables(
+        self, tables: typing.Iterable[str]
+    ) -> typing.List[str]:
+        assert self._tables is not None
+        result: typing.Set[str] = set()
+        pending = list(tables)
+        while pending:
+            table = pending.pop()
+            if table not in result:
+                result.add(table)
+                pending.extend(self._referencing_tables.get(table, ()))
+        return [table for table in self._tables if table in result]
+
+    def _apply(
+        self,
+        cursor,
+        truncate_sql: typing.Optional[str],
+        queries: typing.List[AnyPgQuery],
+    ) -> bool:
+        if any(isinstance(query, PgCopyQuery) for query in queries):
+            return self._apply_in_transaction(truncate_sql, queries)
+        return self._apply_batch(cursor, truncate_sql, queries)
 
     @staticmethod
-    def _apply_query(cursor, query: PgQuery) -> None:
+    def _apply_batch(
+        cursor,
+        truncate_sql: typing.Optional[str],
+        queries: typing.List[AnyPgQuery],
+    ) -> bool:
+        """Apply queries as single multi-statement query.
+
+        Returns ``False`` if queries failed and should be replayed one by one
+        to find the erroneous one. Lock errors are raised, replay would wait
+        for the same locks.
+        """
+        batch = [query.body for query in queries]
+        if truncate_sql:
+            batch.insert(0, truncate_sql)
         try:
-            cursor.execute(query.body)
+            cursor.execute(BATCH_SEPARATOR.join(batch))
+        except psycopg2.DatabaseError as exc:
+            if _is_lock_error(exc):
+                raise
+            logger.debug('Batched queries apply failed: %r', exc)
+            return False
+        return True
+
+    def _apply_in_transaction(
+        self,
+        truncate_sql: typing.Optional[str],
+        queries: typing.List[AnyPgQuery],
+    ) -> bool:
+        """Apply queries mixed with COPY statements in explicit transaction.
+
+        COPY data cannot be sent within multi-statement query, consecutive
+        regular queries are still batched.
+        """
+        conn = self.conn
+        conn.autocommit = False
+        try:
+            with conn.cursor() as cursor:
+                batch = [truncate_sql] if truncate_sql else []
+                for query in queries:
+                    if isinstance(query, PgCopyQuery):
+                        if batch:
+                            cursor.execute(BATCH_SEPARATOR.join(batch))
+                            batch = []
+                        cursor.copy_expert(query.body, io.StringIO(query.data))
+                    else:
+                        batch.append(query.body)
+                if batch:
+                    cursor.execute(BATCH_SEPARATOR.join(batch))
+            conn.commit()
+        except psycopg2.DatabaseError as exc:
+            conn.rollback()
+            if _is_lock_error(exc):
+                raise
+            logger.debug('Batched queries apply failed: %r', exc)
+            return False
+        finally:
+            conn.autocommit = True
+        return True
+
+    @staticmethod
+    def _apply_query(cursor, query: AnyPgQuery) -> None:
+        try:
+            if isinstance(query, PgCopyQuery):
+                cursor.copy_expert(query.body, io.StringIO(query.data))
+            else:
+                cursor.execute(query.body)
         except psycopg2.DatabaseError as exc:
             error_message = (
                 f'PostgreSQL apply query error\nQuery from: {query.source}\n'
@@ -194,6 +569,43 @@ class PgDatabaseWrapper:
         """
         return self._connection.dict_cursor(**kwargs)
 
+    async def execute(self, query: str, params=None) -> None:
+        """Execute query without blocking event loop.
+
+        Queries are run in a separate thread over the same connection as
+        :py:meth:`cursor`, so mockserver keeps handling requests while
+        the query is running.
+        """
+        await self._run_async(lambda cursor: cursor.execute(query, params), {})
+
+    async def fetchone(
+        self, query: str, params=None, **kwargs
+    ) -> typing.Optional[typing.Any]:
+        """Execute query without blocking event loop and return the first row.
+
+        :param kwargs: cursor arguments, e.g. ``cursor_factory``
+        """
+
+        def fetch(cursor):
+            cursor.execute(query, params)
+            return cursor.fetchone()
+
+        return await self._run_async(fetch, kwargs)
+
+    async def fetchall(
+        self, query: str, params=None, **kwargs
+    ) -> typing.List[typing.Any]:
+        """Execute query without blocking event loop and return all rows.
+
+        :param kwargs: cursor arguments, e.g. ``cursor_factory``
+        """
+
+        def fetch(cursor):
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+        return await self._run_async(fetch, kwargs)
+
     def apply_queries(self, queries: typing.Iterable[str]) -> None:
         """Apply queries to database"""
         warnings.warn(
@@ -210,12 +622,28 @@ class PgDatabaseWrapper:
             ],
         )
 
+    async def _run_async(
+        self,
+        func: typing.Callable[[psycopg2.extensions.cursor], _T],
+        cursor_kwargs: typing.Dict[str, typing.Any],
+    ) -> _T:
+        def run():
+            cursor = self._connection.cursor(**cursor_kwargs)
+            with contextlib.closing(cursor):
+                return func(cursor)
+
+        return await asyncio.wrap_future(self._connection.submit(run))
+
 
 class PgControl:
     _applied_schemas: typing.Dict[str, typing.Set[pathlib.Path]]
     _connections: typing.Dict[str, ConnectionWrapper]
     _connection_pool: typing.Optional[pool.AutocommitConnectionPool]
+    _connection_manager: pool.ConnectionManager
     _applied_schema_hashes: typing.Optional[testsuite_db.AppliedSchemaHashes]
+    _snapshots: typing.Set[str]
+    _snapshot_spares: typing.Dict[str, concurrent.futures.Future[str]]
+    _template_hashes: typing.Optional[testsuite_db.AppliedSchemaHashes]
 
     def __init__(
         self,
@@ -223,16 +651,44 @@ class PgControl:
         *,
         verbose: int,
         skip_applied_schemas: bool,
+        connection_pool_minconn: int = 1,
+        hash_cache_path: typing.Optional[pathlib.Path] = None,
+        worker_id: typing.Optional[str] = None,
+        worker_lock_path: typing.Optional[pathlib.Path] = None,
     ) -> None:
+        """
+        :param worker_id: name of xdist worker sharing PostgreSQL server with
+            other workers. Worker gets own copy of each database cloned from
+            template database built once for all workers.
+        :param worker_lock_path: path of file lock guarding template databases
+            between workers.
+        """
+        assert worker_id is None or worker_lock_path is not None
         self._connection_pool = None
+        self._connection_manager = pool.ConnectionManager(
+            minconn=connection_pool_minconn,
+        )
         self._conninfo = pgsql_conninfo
         self._connections = {}
         self._psql_helper = _get_psql_helper()
         self._pgmigrate = _get_pgmigrate()
+        self._pgmigrate_module = migrate.get_pgmigrate()
         self._verbose = verbose
         self._applied_schemas = {}
         self._skip_applied_schemas = skip_applied_schemas
         self._applied_schema_hashes = None
+        self._template_hashes = None
+        self._worker_id = worker_id
+        self._worker_lock_path = worker_lock_path
+        self._hash_cache = utils.FilesHashCache(hash_cache_path)
+        self._snapshots = set()
+        self._snapshot_spares = {}
+        self._snapshot_executer = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+        )
+        self._schema_executer = concurrent.futures.ThreadPoolExecutor(
+            max_workers=SCHEMA_APPLY_WORKERS,
+        )
 
     def initialize(self) -> None:
         if not self._connection_pool:
@@ -240,6 +696,15 @@ class PgControl:
                 minconn=1, maxconn=10, uri=self._get_connection_uri('postgres')
             )
 
+        if self._worker_id is not None and not self._template_hashes:
+            assert self._worker_lock_path
+            # testsuite database is created by the first worker
+            with utils.file_lock(self._worker_lock_path):
+                self._template_hashes = testsuite_db.AppliedSchemaHashes(
+                    self._connection_pool,
+                    self._conninfo,
+                )
+
         if self._skip_applied_schemas:
             self._applied_schema_hashes = testsuite_db.AppliedSchemaHashes(
                 self._connection_pool,
@@ -249,39 +714,135 @@ class PgControl:
     def get_connection_cached(self, dbname) -> ConnectionWrapper:
         if dbname not in self._connections:
             self._connections[dbname] = ConnectionWrapper(
-                self._conninfo.replace(dbname=dbname),
+                self._conninfo.replace(dbname=self._get_worker_dbname(dbname)),
+                self._connection_manager,
             )
         return self._connections[dbname]
 
+    def get_connection_stats(self) -> typing.Dict[str, pool.ConnectionStats]:
+        """Returns connection usage stats by database name."""
+        return self._connection_manager.get_stats()
+
     def initialize_sharded_db(
         self,
         database: discover.PgShardedDatabase,
+        parallel: bool = False,
     ) -> None:
         logger.debug(
             'Initializing database %s for service %s...',
             database.dbname,
             database.service_name,
         )
-        for shard in database.shards:
-            self._initialize_shard(shard)
+        if parallel and len(database.shards) > 1:
+            futures = [
+                self._schema_executer.submit(self._initialize_shard, shard)
+                for shard in database.shards
+            ]
+            for future in futures:
+                future.result()
+        else:
+            for shard in database.shards:
+                self._initialize_shard(shard)
 
     def _initialize_shard(self, shard: discover.PgShard) -> None:
-        logger.debug('Initializing shard %s', shard.dbname)
+        dbname = self._get_worker_dbname(shard.dbname)
+        logger.debug('Initializing shard %s', dbname)
         if self._applied_schema_hashes is None:
-            self._create_database(shard.dbname)
-            self._apply_schema(shard)
+            self._create_shard_database(dbname, shard)
         else:
-            applied_hash = self._applied_schema_hashes.get_hash(shard.dbname)
-            current_hash = shard.get_schema_hash()
+            applied_hash = self._applied_schema_hashes.get_hash(dbname)
+            current_hash = shard.get_schema_hash(self._hash_cache)
             if applied_hash is not None and current_hash == applied_hash:
-                logger.debug('Shard %s: schema is up to date', shard.dbname)
+                logger.debug('Shard %s: schema is up to date', dbname)
+                return
+            applied_files = self._applied_schema_hashes.get_files(dbname)
+            current_files = self._get_schema_files(shard)
+            # Ledger is cleared first, so that interrupted apply is detected
+            self._applied_schema_hashes.set_files(dbname, [])
+            if (
+                self._template_hashes is None
+                and applied_files
+                and current_files[: len(applied_files)] == applied_files
+            ):
+                self._apply_schema_delta(
+                    dbname, shard, current_files[len(applied_files) :]
+                )
             else:
-                self._create_database(shard.dbname)
-                self._apply_schema(shard)
-                self._applied_schema_hashes.set_hash(
-                    shard.dbname,
-                    current_hash,
+                self._create_shard_database(dbname, shard)
+            self._applied_schema_hashes.set_files(dbname, current_files)
+            self._applied_schema_hashes.set_hash(dbname, current_hash)
+
+    def _get_schema_files(
+        self, shard: discover.PgShard
+    ) -> testsuite_db.SchemaFiles:
+        """Returns paths and hashes of schema files in apply order, every
+        file of migration directories is listed.
+        """
+        paths = list(shard.files)
+        for migrations_path in shard.migrations:
+            paths.extend(
+                sorted(
+                    path
+                    for path in migrations_path.rglob('*')
+                    if path.is_file()
                 )
+            )
+        return [
+            (str(path), self._hash_cache.get_file_hash(path)) for path in paths
+        ]
+
+    def _apply_schema_delta(
+        self,
+        dbname: str,
+        shard: discover.PgShard,
+        delta: testsuite_db.SchemaFiles,
+    ) -> None:
+        """Apply schema files added after those already applied to existing
+        database, migrations are applied by pgmigrate skipping versions
+        recorded in the database.
+        """
+        logger.debug(
+            'Shard %s: applying %d new schema files', dbname, len(delta)
+        )
+        delta_paths = {pathlib.Path(path) for path, _ in delta}
+        for path in shard.files:
+            if path in delta_paths:
+                self._run_script(dbname, path)
+        for migrations_path in shard.migrations:
+            if any(migrations_path in path.parents for path in delta_paths):
+                self._run_pgmigrate(dbname, migrations_path)
+        self._applied_schemas[dbname] = {*shard.files, *shard.migrations}
+
+    def _create_shard_database(
+        self, dbname: str, shard: discover.PgShard
+    ) -> None:
+        if self._template_hashes is None:
+            self._create_database(dbname)
+            self._apply_schema(dbname, shard)
+            return
+
+        assert self._worker_lock_path
+        template = shard.dbname + WORKER_TEMPLATE_SUFFIX
+        current_hash = shard.get_schema_hash(self._hash_cache)
+        with utils.file_lock(self._worker_lock_path):
+            if self._template_hashes.fetch_hash(template) != current_hash:
+                logger.debug('Building template database %s', template)
+                self._applied_schemas.pop(template, None)
+                self._create_database(template)
+                self._apply_schema(template, shard)
+                self._template_hashes.set_hash(template, current_hash)
+            logger.debug('Cloning database %s from %s', dbname, template)
+            self._execute_exclusive(
+                dbname, DROP_DATABASE_TEMPLATE.format(dbname)
+            )
+            # Pooled connections left after building template prevent cloning
+            self._execute_exclusive(
+                template,
+                CREATE_DATABASE_FROM_SNAPSHOT_TEMPLATE.format(
+                    dbname=dbname, template=template
+                ),
+            )
+        self._applied_schemas[dbname] = {*shard.files, *shard.migrations}
 
     def _create_database(self, dbname: str) -> None:
         if dbname in self._applied_schemas:
@@ -294,19 +855,19 @@ class PgControl:
                 cursor.execute(CREATE_DATABASE_TEMPLATE.format(dbname))
         self._applied_schemas[dbname] = set()
 
-    def _apply_schema(self, shard: discover.PgShard) -> None:
-        applied_schemas = self._applied_schemas[shard.dbname]
+    def _apply_schema(self, dbname: str, shard: discover.PgShard) -> None:
+        applied_schemas = self._applied_schemas[dbname]
         for path in shard.files:
             if path in applied_schemas:
                 continue
-            self._run_script(shard.dbname, path)
+            self._run_script(dbname, path)
             applied_schemas.add(path)
 
         if shard.migrations:
             for path in shard.migrations:
                 if path in applied_schemas:
                     continue
-                self._run_pgmigrate(shard.dbname, path)
+                self._run_pgmigrate(dbname, path)
                 applied_schemas.add(path)
 
     def _run_script(self, dbname, path) -> None:
@@ -315,6 +876,8 @@ class PgControl:
             path,
             dbname,
         )
+        if self._run_script_in_process(dbname, path):
+            return
         command = [
             str(self._psql_helper),
             '-q',
@@ -338,12 +901,46 @@ class PgControl:
                 f'{exc}',
             ) from None
 
+    def _run_script_in_process(self, dbname, path) -> bool:
+        """Apply sql script over dedicated connection instead of running psql.
+
+        Scripts with psql meta-commands or own transaction control are left
+        to psql. Multi-statement query runs in implicit transaction, so on
+        error the database is left untouched and the script is rerun with
+        psql to report the error. Connection is closed afterwards, so that
+        session state set by the script does not leak into tests.
+        """
+        script = pathlib.Path(path).read_text()
+        if PSQL_META_COMMAND_RE.search(script):
+            return False
+        if TRANSACTION_CONTROL_RE.search(DOLLAR_QUOTED_RE.sub('', script)):
+            return False
+        if not script.strip():
+            return True
+        conninfo = self._conninfo.replace(dbname=dbname)
+        conn = psycopg2.connect(conninfo.get_uri())
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(script)
+        except psycopg2.Error as exc:
+            logger.debug(
+                'Failed to apply sql script %s in-process: %r', path, exc
+            )
+            return False
+        finally:
+            conn.close()
+        return True
+
     def _run_pgmigrate(self, dbname, path) -> None:
         logger.debug(
             'Running migrations from %s against database %s',
             path,
             dbname,
         )
+        if self._pgmigrate_module:
+            self._run_pgmigrate_in_process(dbname, path)
+            return
         command = [
             str(self._pgmigrate),
             '-c',
@@ -368,11 +965,131 @@ class PgControl:
                 f'{exc}'
             ) from None
 
+    def _run_pgmigrate_in_process(self, dbname, path) -> None:
+        pgmigrate = self._pgmigrate_module
+        assert pgmigrate is not None
+        try:
+            migrate.migrate(pgmigrate, self._get_connection_dsn(dbname), path)
+        except (psycopg2.Error, pgmigrate.MigrateError) as exc:
+            raise exceptions.PostgresqlError(
+                f'Failed to run pgmigrate for DB {dbname!r}\n'
+                f'path: {path}\n\n'
+                f'{exc}'
+            ) from None
+
+    def apply_queries_from_snapshot(
+        self,
+        conn: ConnectionWrapper,
+        queries: typing.List[AnyPgQuery],
+    ) -> None:
+        """Reset database to the state after applying ``queries``.
+
+        The first time a set of queries is seen for a database they are
+        applied as usual and a template database is cloned from the result.
+        Later the database is recreated from the template, or swapped with
+        a copy pre-cloned in background. Database is dropped on reset, so
+        open connections to it are terminated.
+        """
+        dbname = conn.conninfo.dbname
+        assert dbname
+        snapshot = _get_snapshot_name(dbname, queries)
+        conn.disconnect()
+        if snapshot not in self._snapshots:
+            conn.apply_queries(queries)
+            conn.disconnect()
+            logger.debug(
+                'Creating snapshot %s of database %s', snapshot, dbname
+            )
+            self._execute_exclusive(
+                dbname,
+                CREATE_DATABASE_FROM_SNAPSHOT_TEMPLATE.format(
+                    dbname=snapshot, template=dbname
+                ),
+            )
+            self._snapshots.add(snapshot)
+        else:
+            spare = self._snapshot_spares.pop(snapshot, None)
+            self._execute_exclusive(
+                dbname, DROP_DATABASE_TEMPLATE.format(dbname)
+            )
+            with self._connection_pool.get_connection() as connection:
+                with connection.cursor() as cursor:
+                    if spare:
+                        cursor.execute(
+                            RENAME_DATABASE_TEMPLATE.format(
+                                spare.result(), dbname
+                            ),
+                        )
+                    else:
+                        cursor.execute(
+                            CREATE_DATABASE_FROM_SNAPSHOT_TEMPLATE.format(
+                                dbname=dbname, template=snapshot
+                            ),
+                        )
+        self._snapshot_spares[snapshot] = self._snapshot_executer.submit(
+            self._create_snapshot_spare, snapshot
+        )
+
     def close(self):
+        self._hash_cache.save()
+        self._schema_executer.shutdown()
+        self._snapshot_executer.shutdown()
+        if self._snapshots:
+            self._drop_snapshots()
         if self._connection_pool:
             self._connection_pool.close()
         for conn in self._connections.values():
             conn.close()
+        for dbname, stats in self.get_connection_stats().items():
+            logger.debug('Database %s connection stats: %s', dbname, stats)
+        self._connection_manager.close()
+
+    def _create_snapshot_spare(self, snapshot: str) -> str:
+        spare = snapshot + SNAPSHOT_SPARE_SUFFIX
+        with self._connection_pool.get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(DROP_DATABASE_TEMPLATE.format(spare))
+                cursor.execute(
+                    CREATE_DATABASE_FROM_SNAPSHOT_TEMPLATE.format(
+                        dbname=spare, template=snapshot
+                    ),
+                )
+        return spare
+
+    def _drop_snapshots(self) -> None:
+        with self._connection_pool.get_connection() as connection:
+            with connection.cursor() as cursor:
+                for snapshot in self._snapshots:
+                    logger.debug('Dropping snapshot %s', snapshot)
+                    cursor.execute(
+                        DROP_DATABASE_TEMPLATE.format(
+                            snapshot + SNAPSHOT_SPARE_SUFFIX
+                        ),
+                    )
+                    cursor.execute(DROP_DATABASE_TEMPLATE.format(snapshot))
+
+    def _execute_exclusive(self, dbname: str, query: str) -> None:
+        """Execute query requiring no other sessions connected to database."""
+        with self._connection_pool.get_connection() as connection:
+            with connection.cursor() as cursor:
+                for attempt in range(SNAPSHOT_RETRIES):
+                    cursor.execute(TERMINATE_BACKENDS_SQL, (dbname,))
+                    try:
+                        cursor.execute(query)
+                        return
+                    except psycopg2.OperationalError as exc:
+                        if (
+                            exc.pgcode != psycopg2.errorcodes.OBJECT_IN_USE
+                            or attempt == SNAPSHOT_RETRIES - 1
+                        ):
+                            raise
+                        logger.warning('Database %s is in use: %r', dbname, exc)
+                        time.sleep(SNAPSHOT_RETRY_DELAY)
+
+    def _get_worker_dbname(self, dbname: str) -> str:
+        if self._worker_id is None:
+            return dbname
+        return f'{dbname}_{self._worker_id}'
 
     def _get_connection_uri(self, dbname: str) -> str:
         return self._conninfo.replace(dbname=dbname).get_uri()
@@ -381,6 +1098,34 @@ class PgControl:
         return self._conninfo.replace(dbname=dbname).get_dsn()
 
 
+def _is_lock_error(exc: psycopg2.Error) -> bool:
+    return (
+        isinstance(exc, psycopg2.extensions.TransactionRollbackError)
+        or exc.pgcode == psycopg2.errorcodes.LOCK_NOT_AVAILABLE
+    )
+
+
+def _format_lock_holders(lock_holders: typing.List[typing.Tuple]) -> str:
+    if not lock_holders:
+        return '  none'
+    return '\n'.join(
+        f'  pid={pid} state={state} application={application!r} '
+        f'transaction_age={transaction_age} query={query!r}'
+        for pid, state, application, transaction_age, query in lock_holders
+    )
+
+
+def _get_snapshot_name(dbname: str, queries: typing.List[AnyPgQuery]) -> str:
+    snapshot_hash = hashlib.sha1(dbname.encode('utf-8'))
+    for query in queries:
+        snapshot_hash.update(b'%d\n' % len(query.body))
+        snapshot_hash.update(query.body.encode('utf-8'))
+        if isinstance(query, PgCopyQuery):
+            snapshot_hash.update(b'%d\n' % len(query.data))
+            snapshot_hash.update(query.data.encode('utf-8'))
+    return SNAPSHOT_PREFIX + snapshot_hash.hexdigest()[:16]
+
+
 def _get_psql_helper() -> pathlib.Path:
     return service.SCRIPTS_DIR.joinpath('psql-helper')
 
@@ -4,8 +4,11 @@ import hashlib
 import itertools
 import logging
 import pathlib
+import time
 import typing
-from typing import DefaultDict, Dict, Iterable, List, Optional
+from typing import DefaultDict, Dict, List, Optional
+
+from testsuite.utils import files_cache
 
 from . import exceptions, utils
 
@@ -43,6 +46,15 @@ class ShardFileInfo:
 ShardPathesDict = Dict[int, ShardFileInfo]
 
 
+@dataclasses.dataclass(frozen=True)
+class _SchemaDirIndex:
+    signature: typing.Tuple[typing.Tuple[pathlib.Path, int], ...]
+    shard_files_map: DefaultDict[str, ShardPathesDict]
+
+
+_schema_dirs_index: Dict[pathlib.Path, _SchemaDirIndex] = {}
+
+
 @dataclasses.dataclass(frozen=True)
 class PgShard:
     shard_id: int
@@ -51,9 +63,12 @@ class PgShard:
     files: List[pathlib.Path]
     migrations: List[pathlib.Path]
 
-    def get_schema_hash(self) -> str:
+    def get_schema_hash(
+        self, cache: Optional[utils.FilesHashCache] = None
+    ) -> str:
         return utils.get_files_hash(
             itertools.chain(self.files, self.migrations),
+            cache,
         )
 
 
@@ -124,20 +139,42 @@ def _find_databases_schemas(
 def _build_shard_files_map(
     root_path: pathlib.Path,
 ) -> DefaultDict[str, ShardPathesDict]:
+    """Scan schema directory, results are reused for the session until
+    any of the scanned directories is modified.
+    """
+    index = _schema_dirs_index.get(root_path)
+    if index is not None and _is_index_valid(index):
+        return index.shard_files_map
+
     result: DefaultDict[str, ShardPathesDict]
     result = collections.defaultdict(
         lambda: collections.defaultdict(lambda: ShardFileInfo([], [])),
     )
-    for shard in _find_shard_files(root_path):
-        result[shard.name.db_name][shard.name.shard].extend(shard)
+    signature = [(root_path, root_path.stat().st_mtime_ns)]
+    for entry in root_path.iterdir():
+        if entry.is_dir():
+            signature.append((entry, entry.stat().st_mtime_ns))
+        shard = _get_shard_schema_files(entry)
+        if shard is not None:
+            result[shard.name.db_name][shard.name.shard].extend(shard)
+    # Recently modified directory may change again keeping the same mtime
+    racy_mtime_ns = time.time_ns() - files_cache.RACY_INTERVAL_NS
+    if all(mtime_ns < racy_mtime_ns for _, mtime_ns in signature):
+        _schema_dirs_index[root_path] = _SchemaDirIndex(
+            signature=tuple(signature),
+            shard_files_map=result,
+        )
     return result
 
 
-def _find_shard_files(schema_path: pathlib.Path) -> Iterable[ShardFiles]:
-    for entry in schema_path.iterdir():
-        shard_files = _get_shard_schema_files(entry)
-        if shard_files is not None:
-            yield shard_files
+def _is_index_valid(index: _SchemaDirIndex) -> bool:
+    for path, mtime_ns in index.signature:
+        try:
+            if path.stat().st_mtime_ns != mtime_ns:
+                return False
+        except FileNotFoundError:
+            return False
+    return True
 
 
 def _get_shard_schema_files(path: pathlib.Path) -> Optional[ShardFiles]:
@@ -0,0 +1,71 @@
+import contextlib
+import importlib
+import logging
+import pathlib
+import types
+import typing
+
+logger = logging.getLogger(__name__)
+
+# Loggers used by pgmigrate module
+PGMIGRATE_LOGGERS = ('pgmigrate', 'terminator')
+
+
+def get_pgmigrate() -> typing.Optional[types.ModuleType]:
+    """Returns pgmigrate module if it is installed in current environment."""
+    try:
+        return importlib.import_module('pgmigrate')
+    except ImportError:
+        return None
+
+
+def migrate(pgmigrate: types.ModuleType, dsn: str, path: pathlib.Path) -> None:
+    """Apply migrations from ``path`` up to the latest version in-process.
+
+    Versions already recorded by pgmigrate in the database are skipped.
+    pgmigrate closes its connection when done, so it is not taken from
+    testsuite connection pools.
+    """
+    config = pgmigrate.get_config(
+        str(path),
+        types.SimpleNamespace(base_dir=str(path), conn=dsn, target='latest'),
+    )
+    try:
+        with _forward_logs():
+            pgmigrate.migrate(config)
+    finally:
+        if config.terminator_instance:
+            config.terminator_instance.stop()
+        if not config.conn_instance.closed:
+            config.conn_instance.close()
+
+
+class _ForwardHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        logger.log(record.levelno, '%s: %s', record.name, record.getMessage())
+
+
+@contextlib.contextmanager
+def _forward_logs():
+    """Send pgmigrate logs to testsuite logger, as ``pgmigrate -vv`` does."""
+    handler = _ForwardHandler()
+    saved = []
+    for name in PGMIGRATE_LOGGERS:
+        pgmigrate_logger = logging.getLogger(name)
+        saved.append(
+            (
+                pgmigrate_logger,
+                pgmigrate_logger.level,
+                pgmigrate_logger.propagate,
+            )
+        )
+        pgmigrate_logger.setLevel(logging.DEBUG)
+        pgmigrate_logger.propagate = False
+        pgmigrate_logger.addHandler(handler)
+    try:
+        yield
+    finally:
+        for pgmigrate_logger, level, propagate in saved:
+            pgmigrate_logger.removeHandler(handler)
+            pgmigrate_logger.setLevel(level)
+            pgmigrate_logger.propagate = propagate
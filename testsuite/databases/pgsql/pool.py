@@ -1,25 +1,201 @@
+import collections
 import contextlib
+import dataclasses
+import logging
+import threading
+import time
 import typing
 
+import psycopg2
 import psycopg2.extensions
 import psycopg2.pool
 
+from . import connection
+
+logger = logging.getLogger(__name__)
+
+CONNECT_RETRIES = 5
+CONNECT_RETRY_DELAY = 0.05
+
 
 class AutocommitConnectionPool:
+    """Connection pool, waits for free connection when exhausted.
+
+    psycopg2 pool raises ``PoolError`` instead of waiting, while databases
+    and shards are initialized by concurrent threads.
+    """
+
     def __init__(self, minconn: int, maxconn: int, uri: str) -> None:
         self._pool = psycopg2.pool.ThreadedConnectionPool(minconn, maxconn, uri)
+        self._semaphore = threading.BoundedSemaphore(maxconn)
 
     @contextlib.contextmanager
     def get_connection(
         self,
     ) -> typing.Generator[psycopg2.extensions.connection, None, None]:
-        conn = self._pool.getconn()
-        conn.autocommit = True
-
-        try:
-            yield conn
-        finally:
-            self._pool.putconn(conn)
+        with self._semaphore:
+            conn = self._pool.getconn()
+            try:
+                conn.autocommit = True
+                yield conn
+            finally:
+                self._pool.putconn(conn)
 
     def close(self) -> None:
         self._pool.closeall()
+
+
+@dataclasses.dataclass
+class ConnectionStats:
+    """Per-database connection usage counters."""
+
+    #: Number of connections established
+    created: int = 0
+    #: Number of connections handed out from the idle pool
+    reused: int = 0
+    #: Number of broken connections thrown away
+    discarded: int = 0
+    #: Number of failed connection attempts that were retried
+    connect_retries: int = 0
+
+
+class ConnectionManager:
+    """Thread-safe pool of autocommit connections keyed by database.
+
+    Connections are health-checked before being handed out, broken ones are
+    replaced transparently. Establishing a connection is retried with
+    exponential backoff so that a restarted database does not fail every
+    waiting client at once.
+    """
+
+    def __init__(self, *, minconn: int = 1) -> None:
+        self._minconn = minconn
+        self._lock = threading.Lock()
+        self._idle: typing.DefaultDict[
+            connection.PgConnectionInfo,
+            typing.List[psycopg2.extensions.connection],
+        ] = collections.defaultdict(list)
+        self._in_use: typing.DefaultDict[connection.PgConnectionInfo, int] = (
+            collections.defaultdict(int)
+        )
+        self._stats: typing.DefaultDict[
+            connection.PgConnectionInfo, ConnectionStats
+        ] = collections.defaultdict(ConnectionStats)
+
+    def getconn(
+        self, conninfo: connection.PgConnectionInfo
+    ) -> psycopg2.extensions.connection:
+        """Get healthy connection to database, create new one if needed."""
+        while True:
+            with self._lock:
+                idle = self._idle[conninfo]
+                if not idle:
+                    break
+                conn = idle.pop()
+            if _is_healthy(conn, ping=True):
+                with self._lock:
+                    self._stats[conninfo].reused += 1
+                    self._in_use[conninfo] += 1
+                return conn
+            self._discard(conninfo, conn)
+
+        conn = self._connect(conninfo)
+        with self._lock:
+            self._in_use[conninfo] += 1
+        return conn
+
+    def putconn(
+        self,
+        conninfo: connection.PgConnectionInfo,
+        conn: psycopg2.extensions.connection,
+    ) -> None:
+        """Return connection to the pool, broken connections are closed."""
+        with self._lock:
+            self._in_use[conninfo] -= 1
+        if _is_healthy(conn):
+            with self._lock:
+                self._idle[conninfo].append(conn)
+        else:
+            self._discard(conninfo, conn)
+
+    def prewarm(self, conninfo: connection.PgConnectionInfo) -> None:
+        """Make sure at least ``minconn`` connections to database exist."""
+        with self._lock:
+            missing = (
+                self._minconn
+                - len(self._idle[conninfo])
+                - self._in_use[conninfo]
+            )
+        for _ in range(missing):
+            conn = self._connect(conninfo)
+            with self._lock:
+                self._idle[conninfo].append(conn)
+
+    def get_stats(self) -> typing.Dict[str, ConnectionStats]:
+        """Returns snapshot of connection stats by database name."""
+        with self._lock:
+            return {
+                str(conninfo.dbname): dataclasses.replace(stats)
+                for conninfo, stats in self._stats.items()
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    def _connect(
+        self, conninfo: connection.PgConnectionInfo
+    ) -> psycopg2.extensions.connection:
+        delay = CONNECT_RETRY_DELAY
+        for attempt in range(CONNECT_RETRIES):
+            try:
+                conn = psycopg2.connect(conninfo.get_uri())
+                break
+            except psycopg2.OperationalError as exc:
+                if attempt == CONNECT_RETRIES - 1:
+                    raise
+                logger.warning(
+                    'Failed to connect to database %s: %r',
+                    conninfo.dbname,
+                    exc,
+                )
+                with self._lock:
+                    self._stats[conninfo].connect_retries += 1
+                time.sleep(delay)
+                delay *= 2
+        # TODO: remove autocommit, see TAXIDATA-2467
+        conn.autocommit = True
+        with self._lock:
+            self._stats[conninfo].created += 1
+        return conn
+
+    def _discard(
+        self,
+        conninfo: connection.PgConnectionInfo,
+        conn: psycopg2.extensions.connection,
+    ) -> None:
+        with self._lock:
+            self._stats[conninfo].discarded += 1
+        with contextlib.suppress(psycopg2.Error):
+            conn.close()
+
+
+def _is_healthy(
+    conn: psycopg2.extensions.connection, *, ping: bool = False
+) -> bool:
+    if conn.closed:
+        return False
+    status = conn.get_transaction_status()
+    if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+        return False
+    if not ping:
+        return True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except psycopg2.Error:
+        return False
+    return True
@@ -7,7 +7,15 @@ import typing
 
 import pytest
 
-from . import connection, control, discover, exceptions, service, utils
+from . import (
+    connection,
+    control,
+    discover,
+    exceptions,
+    service,
+    tabular,
+    utils,
+)
 
 DB_FILE_RE_PATTERN = re.compile(r'/pg_(?P<pg_db_alias>\w+)(/?\w*)\.sql$')
 
@@ -18,6 +26,7 @@ class ServiceLocalConfig(collections.abc.Mapping):
         databases: typing.List[discover.PgShardedDatabase],
         pgsql_control: control.PgControl,
         cleanup_exclude_tables: typing.FrozenSet[str],
+        truncate_modified_only: bool = False,
     ):
         self._initialized = False
         self._pgsql_control = pgsql_control
@@ -30,6 +39,7 @@ class ServiceLocalConfig(collections.abc.Mapping):
             for shard in db.shards
         }
         self._cleanup_exclude_tables = cleanup_exclude_tables
+        self._truncate_modified_only = truncate_modified_only
 
     def __len__(self) -> int:
         return len(self._shard_connections)
@@ -54,11 +64,18 @@ class ServiceLocalConfig(collections.abc.Mapping):
             self._pgsql_control.initialize()
 
         def init_database(db):
-            self._pgsql_control.initialize_sharded_db(db)
+            self._pgsql_control.initialize_sharded_db(db, parallel_init)
 
             for shard in db.shards:
+                cleanup_exclude_tables = self._cleanup_exclude_tables
+                if shard.migrations:
+                    # Keep applied versions for pgmigrate
+                    cleanup_exclude_tables = cleanup_exclude_tables | {
+                        control.PGMIGRATE_VERSION_TABLE,
+                    }
                 self._shard_connections[shard.pretty_name].initialize(
-                    self._cleanup_exclude_tables
+                    cleanup_exclude_tables,
+                    self._truncate_modified_only,
                 )
 
         if parallel_init:
@@ -76,6 +93,21 @@ class ServiceLocalConfig(collections.abc.Mapping):
         return self._shard_connections
 
 
+class NextItemPlugin:
+    """Keeps track of the test going to run after the current one."""
+
+    def __init__(self):
+        self.nextitem = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self.nextitem = nextitem
+        try:
+            yield
+        finally:
+            self.nextitem = None
+
+
 def pytest_addoption(parser):
     """
     :param parser: pytest's argument parser
@@ -96,6 +128,15 @@ def pytest_addoption(parser):
             'initializing databases.'
         ),
     )
+    group.addoption(
+        '--postgresql-worker-templates',
+        action='store_true',
+        help=(
+            'When running with pytest-xdist against shared PostgreSQL server '
+            'build database schemas once and clone per-worker databases '
+            'from them.'
+        ),
+    )
 
 
 def pytest_configure(config):
@@ -103,6 +144,7 @@ def pytest_configure(config):
         'markers',
         'pgsql: per-test PostgreSQL initialization',
     )
+    config.pluginmanager.register(NextItemPlugin(), 'pgsql_next_item')
 
 
 def pytest_service_register(register_service):
@@ -114,6 +156,24 @@ def pgsql_cleanup_exclude_tables() -> typing.FrozenSet[str]:
     return frozenset()
 
 
+@pytest.fixture(scope='session')
+def pgsql_truncate_modified_tables_only() -> bool:
+    """Truncate only tables modified since the previous test."""
+    return False
+
+
+@pytest.fixture
+def pgsql_snapshot_databases() -> typing.FrozenSet[str]:
+    """Databases reset from template snapshots instead of truncation."""
+    return frozenset()
+
+
+@pytest.fixture(scope='session')
+def pgsql_connection_pool_minconn() -> int:
+    """Minimal number of connections kept open for each database."""
+    return 1
+
+
 @pytest.fixture
 def pgsql(_pgsql, pgsql_apply) -> typing.Dict[str, control.PgDatabaseWrapper]:
     """
@@ -139,6 +199,7 @@ def pgsql(_pgsql, pgsql_apply) -> typing.Dict[str, control.PgDatabaseWrapper]:
 def pgsql_local_create(
     _pgsql_control,
     pgsql_cleanup_exclude_tables,
+    pgsql_truncate_modified_tables_only,
 ) -> typing.Callable[
     [typing.List[discover.PgShardedDatabase]],
     ServiceLocalConfig,
@@ -154,6 +215,7 @@ def pgsql_local_create(
             databases,
             _pgsql_control,
             pgsql_cleanup_exclude_tables,
+            pgsql_truncate_modified_tables_only,
         )
 
     return _pgsql_local_create
@@ -233,10 +295,19 @@ def pgsql_background_truncate_enabled():
     return True
 
 
+@pytest.fixture(scope='session')
+def pgsql_preload_next_queries_enabled() -> bool:
+    """Apply queries of the next test right after background truncation
+    when the next test is known to use the same data, e.g. it is another
+    parametrization of the current test.
+    """
+    return True
+
+
 @pytest.fixture
 def _pgsql_apply_queries(
     request, _pgsql: ServiceLocalConfig, _pgsql_query_loader
-) -> typing.Dict[str, typing.List[control.PgQuery]]:
+) -> typing.Dict[str, typing.List[control.AnyPgQuery]]:
     def pgsql_default_queries(dbname):
         return [
             *_pgsql_query_loader.load(
@@ -251,7 +322,7 @@ def _pgsql_apply_queries(
             ),
         ]
 
-    def pgsql_mark(dbname, files=(), directories=(), queries=()):
+    def pgsql_mark(dbname, files=(), directories=(), queries=(), tables=()):
         result_queries = []
 
         for path in files:
@@ -261,6 +332,11 @@ def _pgsql_apply_queries(
                 path,
                 'mark.pgsql.directories',
             )
+        for path in tables:
+            result_queries += _pgsql_query_loader.load_table(
+                path,
+                'mark.pgsql.tables',
+            )
         for query in queries:
             queries_str: typing.Iterable = []
             if isinstance(query, str):
@@ -283,7 +359,7 @@ def _pgsql_apply_queries(
 
     overrides: typing.DefaultDict[
         str,
-        typing.List[control.PgQuery],
+        typing.List[control.AnyPgQuery],
     ] = collections.defaultdict(list)
     for mark in request.node.iter_markers('pgsql'):
         dbname, queries = pgsql_mark(*mark.args, **mark.kwargs)
@@ -301,10 +377,14 @@ def _pgsql_apply_queries(
 
 @pytest.fixture
 def pgsql_apply(
+    request,
     _pgsql: ServiceLocalConfig,
+    _pgsql_control,
     load,
     pgsql_background_truncate_enabled: bool,
+    pgsql_preload_next_queries_enabled: bool,
     pgsql_parallelization_enabled: bool,
+    pgsql_snapshot_databases: typing.FrozenSet[str],
     _pgsql_apply_queries,
 ) -> None:
     """Initialize PostgreSQL database with data.
@@ -324,18 +404,27 @@ def pgsql_apply(
         ],
         queries=[
           'INSERT INTO foo VALUES (1, 2, 3, 4)',
-        ]
+        ],
+        tables=[
+          'public.foo.csv',
+        ],
     )
     """
 
+    def apply_queries(dbname, pg_db):
+        if dbname in pgsql_snapshot_databases:
+            _pgsql_control.apply_queries_from_snapshot(
+                pg_db, _pgsql_apply_queries[dbname]
+            )
+        else:
+            pg_db.apply_queries(_pgsql_apply_queries[dbname])
+
     if pgsql_parallelization_enabled:
         with concurrent.futures.ThreadPoolExecutor() as executor:
             db_apply_queries_future = []
             for dbname, pg_db in _pgsql.items():
                 db_apply_queries_future.append(
-                    executor.submit(
-                        pg_db.apply_queries, _pgsql_apply_queries[dbname]
-                    )
+                    executor.submit(apply_queries, dbname, pg_db)
                 )
 
             for future in db_apply_queries_future:
@@ -343,26 +432,53 @@ def pgsql_apply(
 
     else:
         for dbname, pg_db in _pgsql.items():
-            pg_db.apply_queries(_pgsql_apply_queries[dbname])
+            apply_queries(dbname, pg_db)
 
     yield
 
     if pgsql_background_truncate_enabled:
-        for pg_db in _pgsql.values():
-            pg_db.schedule_truncation()
+        next_item_plugin = request.config.pluginmanager.get_plugin(
+            'pgsql_next_item',
+        )
+        preload = pgsql_preload_next_queries_enabled and _is_same_pgsql_data(
+            request.node,
+            next_item_plugin.nextitem,
+        )
+        for dbname, pg_db in _pgsql.items():
+            if dbname not in pgsql_snapshot_databases:
+                pg_db.schedule_truncation(
+                    _pgsql_apply_queries[dbname] if preload else None,
+                )
+
+
+@pytest.fixture(scope='session')
+def _pgsql_query_cache() -> typing.Dict[typing.Tuple, control.AnyPgQuery]:
+    return {}
 
 
 @pytest.fixture
-def _pgsql_query_loader(get_file_path, get_directory_path, mockserver_info):
-    def substitute_mockserver(str_val: str):
-        return str_val.replace(
-            '$mockserver',
-            'http://{}:{}'.format(mockserver_info.host, mockserver_info.port),
-        )
+def _pgsql_query_loader(
+    get_file_path, get_directory_path, mockserver_info, _pgsql_query_cache
+):
+    mockserver_url = 'http://{}:{}'.format(
+        mockserver_info.host, mockserver_info.port
+    )
+
+    def load_cached(path, source, factory):
+        # Static file contents are cached for the session by get_file_path
+        cache_key = (str(path), source, mockserver_url)
+        query = _pgsql_query_cache.get(cache_key)
+        if query is None:
+            content = path.read_text().replace('$mockserver', mockserver_url)
+            query = factory(path, content, source)
+            _pgsql_query_cache[cache_key] = query
+        return query
+
+    def create_query(path, content, source):
+        return control.PgQuery(body=content, source=source, path=str(path))
 
     def load_pg_file(path, source):
-        query = substitute_mockserver(path.read_text())
-        return control.PgQuery(body=query, source=source, path=str(path))
+        return load_cached(path, source, create_query)
 
     class Loader:
         @staticmethod
@@ -382,6 +498,11 @@ def _pgsql_query_loader(get_file_path, get_directory_path, mockserver_info):
                 result.append(load_pg_file(path, source))
             return result
 
+        @staticmethod
+        def load_table(path, source):
+            path = get_file_path(path)
+            return [load_cached(path, source, tabular.load_table)]
+
     return Loader()
 
 
@@ -402,9 +523,20 @@ def _pgsql_service(
 
 
 @pytest.fixture(scope='session')
-def _pgsql_control(pytestconfig, _pgsql_conninfo, pgsql_disabled: bool):
+def _pgsql_control(
+    pytestconfig,
+    _pgsql_conninfo,
+    pgsql_disabled: bool,
+    pgsql_connection_pool_minconn: int,
+    testsuite_env_dir,
+    worker_id: str,
+):
     if pgsql_disabled:
         return {}
+    use_worker_templates = (
+        pytestconfig.option.postgresql_worker_templates
+        and worker_id != 'master'
+    )
     instance = control.PgControl(
         _pgsql_conninfo,
         verbose=pytestconfig.option.verbose,
@@ -412,6 +544,14 @@ def _pgsql_control(pytestconfig, _pgsql_conninfo, pgsql_disabled: bool):
             pytestconfig.option.postgresql_keep_existing_db
             or pytestconfig.option.service_wait
         ),
+        connection_pool_minconn=pgsql_connection_pool_minconn,
+        hash_cache_path=testsuite_env_dir.joinpath(
+            'postgresql-schema-hashes.json'
+        ),
+        worker_id=worker_id if use_worker_templates else None,
+        worker_lock_path=testsuite_env_dir.joinpath(
+            'postgresql-templates.lock'
+        ),
     )
     with contextlib.closing(instance):
         yield instance
@@ -431,3 +571,26 @@ def _pgsql_conninfo(
     if connstr:
         return connection.parse_connection_string(connstr)
     return _pgsql_service_settings.get_conninfo()
+
+
+def _is_same_pgsql_data(item, nextitem) -> bool:
+    """Check that both tests load the same pgsql data files and queries.
+
+    Data files are looked up in directories named after test module and
+    test function, so tests must share both.
+    """
+    if nextitem is None:
+        return False
+    if getattr(item, 'module', None) is not getattr(nextitem, 'module', None):
+        return False
+    if _get_original_name(item) != _get_original_name(nextitem):
+        return False
+    return _get_pgsql_marks(item) == _get_pgsql_marks(nextitem)
+
+
+def _get_original_name(item) -> str:
+    return getattr(item, 'originalname', None) or item.name
+
+
+def _get_pgsql_marks(item) -> typing.List[typing.Tuple]:
+    return [(mark.args, mark.kwargs) for mark in item.iter_markers('pgsql')]
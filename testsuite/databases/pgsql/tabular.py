@@ -0,0 +1,91 @@
+import csv
+import json
+import pathlib
+import typing
+
+from . import control, exceptions
+
+COPY_CSV_TEMPLATE = 'COPY {table}{columns} FROM STDIN WITH (FORMAT csv)'
+COPY_TEXT_TEMPLATE = 'COPY {table}{columns} FROM STDIN'
+
+
+def load_table(
+    path: pathlib.Path, content: str, source: str
+) -> control.PgCopyQuery:
+    """Convert tabular data file into COPY query.
+
+    Table name is taken from file name, e.g. ``public.foo.csv``. Supported
+    formats are:
+
+    * ``.csv`` - CSV with header row
+    * ``.tsv`` - PostgreSQL text COPY format with header row
+    * ``.jsonl`` - one JSON object per line, missing keys are NULL
+    """
+    if path.suffix == '.csv':
+        header, _, data = content.partition('\n')
+        columns = next(csv.reader([header.rstrip('\r')]))
+        template = COPY_CSV_TEMPLATE
+    elif path.suffix == '.tsv':
+        header, _, data = content.partition('\n')
+        columns = header.rstrip('\r').split('\t')
+        template = COPY_TEXT_TEMPLATE
+    elif path.suffix == '.jsonl':
+        columns, data = _convert_json_lines(path, content)
+        template = COPY_CSV_TEMPLATE
+    else:
+        raise exceptions.PostgresqlError(
+            f'Unsupported table data file format: {path}',
+        )
+    return control.PgCopyQuery(
+        body=template.format(table=path.stem, columns=_format_columns(columns)),
+        data=data,
+        source=source,
+        path=str(path),
+    )
+
+
+def _convert_json_lines(
+    path: pathlib.Path, content: str
+) -> typing.Tuple[typing.List[str], str]:
+    rows = []
+    columns: typing.Dict[str, None] = {}
+    for lineno, line in enumerate(content.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            raise exceptions.PostgresqlError(
+                f'Failed to parse {path}:{lineno}: {exc}',
+            ) from None
+        if not isinstance(row, dict):
+            raise exceptions.PostgresqlError(
+                f'JSON object expected at {path}:{lineno}',
+            )
+        columns.update(dict.fromkeys(row))
+        rows.append(row)
+    data = ''.join(
+        ','.join(_format_csv_value(row.get(column)) for column in columns)
+        + '\n'
+        for row in rows
+    )
+    return list(columns), data
+
+
+def _format_csv_value(value: typing.Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        value = 'true' if value else 'false'
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    else:
+        value = str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _format_columns(columns: typing.List[str]) -> str:
+    if not columns:
+        return ''
+    quoted = ('"' + column.replace('"', '""') + '"' for column in columns)
+    return ' (' + ', '.join(quoted) + ')'
@@ -16,6 +16,13 @@ CREATE TABLE IF NOT EXISTS applied_schemas (
     db_name TEXT PRIMARY KEY,
     schema_hash TEXT
 );
+CREATE TABLE IF NOT EXISTS applied_schema_files (
+    db_name TEXT,
+    position INTEGER,
+    path TEXT,
+    file_hash TEXT,
+    PRIMARY KEY (db_name, position)
+);
 """
 
 UPDATE_DB_HASH_TEMPLATE = """
@@ -26,8 +33,22 @@ ON CONFLICT (db_name) DO UPDATE SET
 WHERE applied_schemas.db_name = %(dbname)s
 """
 SELECT_DB_HASH_TEMPLATE = 'SELECT db_name, schema_hash FROM applied_schemas'
+SELECT_ONE_DB_HASH_TEMPLATE = (
+    'SELECT schema_hash FROM applied_schemas WHERE db_name = %s'
+)
+SELECT_DB_FILES_TEMPLATE = """
+SELECT path, file_hash FROM applied_schema_files
+WHERE db_name = %s ORDER BY position
+"""
+DELETE_DB_FILES_TEMPLATE = 'DELETE FROM applied_schema_files WHERE db_name = %s'
+INSERT_DB_FILE_TEMPLATE = """
+INSERT INTO applied_schema_files (db_name, position, path, file_hash)
+VALUES (%s, %s, %s, %s)
+"""
 TESTSUITE_DB_NAME = 'testsuite'
 
+SchemaFiles = typing.List[typing.Tuple[str, str]]
+
 
 class AppliedSchemaHashes:
     def __init__(
@@ -45,6 +66,16 @@ class AppliedSchemaHashes:
         """Get hash of schema applied to a database"""
         return self._hash_by_dbname.get(dbname, None)
 
+    def fetch_hash(self, dbname: str) -> typing.Optional[str]:
+        """Get hash of schema applied to a database bypassing local cache,
+        the database may be shared with other testsuite processes
+        """
+        with self._pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(SELECT_ONE_DB_HASH_TEMPLATE, (dbname,))
+                row = cursor.fetchone()
+        return row[0] if row else None
+
     def set_hash(self, dbname: str, schema_hash: str):
         """Store in testsuite database and remember locally a hash of schema
         applied to a database
@@ -58,6 +89,29 @@ class AppliedSchemaHashes:
                     {'dbname': dbname, 'hash': schema_hash},
                 )
 
+    def get_files(self, dbname: str) -> SchemaFiles:
+        """Get paths and hashes of schema files applied to a database in
+        apply order
+        """
+        with self._pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(SELECT_DB_FILES_TEMPLATE, (dbname,))
+                return [(path, file_hash) for path, file_hash in cursor]
+
+    def set_files(self, dbname: str, files: SchemaFiles) -> None:
+        """Store paths and hashes of schema files applied to a database"""
+        with self._pool.get_connection() as conn:
+            conn.autocommit = False
+            with conn, conn.cursor() as cursor:
+                cursor.execute(DELETE_DB_FILES_TEMPLATE, (dbname,))
+                cursor.executemany(
+                    INSERT_DB_FILE_TEMPLATE,
+                    [
+                        (dbname, position, path, file_hash)
+                        for position, (path, file_hash) in enumerate(files)
+                    ],
+                )
+
     @utils.cached_property
     def _hash_by_dbname(self) -> typing.Dict[str, str]:
         with self._pool.get_connection() as conn:
@@ -1,8 +1,16 @@
+import concurrent.futures
+import contextlib
+import fcntl
 import hashlib
 import pathlib
 import typing
 import urllib.parse
 
+from testsuite.utils import files_cache
+
+HASH_CHUNK_SIZE = 1 << 20
+HASH_WORKERS = 8
+
 
 def scan_sql_directory(root: pathlib.Path) -> typing.List[pathlib.Path]:
     return [
@@ -25,22 +33,55 @@ def connstr_replace_dbname(connstr: str, dbname: str) -> str:
     )
 
 
-def get_files_hash(paths: typing.Iterable[pathlib.Path]) -> str:
-    result = hashlib.md5()
+@contextlib.contextmanager
+def file_lock(path: pathlib.Path) -> typing.Iterator[None]:
+    """Exclusive lock shared between processes and threads."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class FilesHashCache(files_cache.FilesCache):
+    """Cache of file content hashes persisted between sessions."""
+
+    def get_file_hash(self, path: pathlib.Path) -> str:
+        return self.get(path, _hash_file)
+
+
+def get_files_hash(
+    paths: typing.Iterable[pathlib.Path],
+    cache: typing.Optional[FilesHashCache] = None,
+) -> str:
+    files: typing.List[pathlib.Path] = []
     for path in paths:
         if path.is_dir():
-            files = sorted(
-                child for child in path.rglob('*') if child.is_file()
+            files.extend(
+                sorted(child for child in path.rglob('*') if child.is_file())
             )
         elif path.is_file():
-            files = [path]
-        else:
-            continue
-
-        for file_path in files:
-            result.update(bytes(str(file_path) + '\n', 'utf8'))
-            with file_path.open('rb') as file:
-                content = file.read()
-            result.update(b'%d\n' % len(content))
-            result.update(content)
+            files.append(path)
+
+    if cache is None:
+        cache = FilesHashCache()
+    if len(files) > 1:
+        with concurrent.futures.ThreadPoolExecutor(HASH_WORKERS) as executor:
+            digests = list(executor.map(cache.get_file_hash, files))
+    else:
+        digests = [cache.get_file_hash(file_path) for file_path in files]
+
+    result = hashlib.blake2b()
+    for file_path, digest in zip(files, digests):
+        result.update(bytes(f'{file_path}\n{digest}\n', 'utf8'))
     return result.hexdigest()
+
+
+def _hash_file(path: pathlib.Path) -> str:
+    file_hash = hashlib.blake2b()
+    with path.open('rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
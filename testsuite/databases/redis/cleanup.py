@@ -0,0 +1,142 @@
+import typing
+
+import redis as redisdb
+
+NOTIFY_KEYSPACE_EVENTS = 'EA'
+KEYEVENT_PATTERN = '__keyevent@*__:*'
+REMOVE_EVENTS = frozenset([b'del', b'unlink', b'expired', b'evicted'])
+UNLINK_CHUNK_SIZE = 1000
+PONG_TIMEOUT = 5.0
+# Server disconnects subscriber on output buffer overflow, notifications
+# are lost then. Buffer of tracking subscriber is not limited.
+PUBSUB_OUTPUT_BUFFER_LIMIT = 'pubsub 0 0 0'
+
+
+class KeyspaceTracker:
+    """Tracks keys modified on redis nodes with keyspace notifications.
+
+    Writes made by fixtures and by the service under test are reported by
+    the server, so that only modified keys are unlinked on cleanup instead
+    of flushing the whole node. Nodes are flushed once when tracking starts.
+    """
+
+    def __init__(self, clients: typing.Iterable[redisdb.Redis]) -> None:
+        self._subscriptions = [_Subscription(client) for client in clients]
+
+    def cleanup(self) -> bool:
+        """Remove keys modified since the previous cleanup.
+
+        Node is flushed if keys of other databases were modified or
+        notifications might be lost, e.g. subscriber was reconnected.
+
+        :returns: ``True`` if anything was removed
+        """
+        changed = False
+        for subscription in self._subscriptions:
+            if subscription.cleanup():
+                changed = True
+        return changed
+
+    def close(self) -> None:
+        for subscription in self._subscriptions:
+            subscription.close()
+        self._subscriptions = []
+
+
+class _Subscription:
+    def __init__(self, client: redisdb.Redis) -> None:
+        self._client = client
+        self._db = _get_db(client)
+        self._pubsub: typing.Optional[redisdb.client.PubSub] = None
+        self._notifications_lost = False
+        client.config_set('notify-keyspace-events', NOTIFY_KEYSPACE_EVENTS)
+        client.config_set(
+            'client-output-buffer-limit', PUBSUB_OUTPUT_BUFFER_LIMIT
+        )
+        self._subscribe()
+
+    def cleanup(self) -> bool:
+        try:
+            keys = self._collect_keys()
+        except (redisdb.ConnectionError, redisdb.TimeoutError):
+            keys = None
+            self._notifications_lost = True
+        if self._notifications_lost:
+            self._subscribe()
+        elif keys is None:
+            self._client.flushall()
+        elif keys:
+            _unlink(self._client, keys)
+        else:
+            return False
+        return True
+
+    def close(self) -> None:
+        if self._pubsub is None:
+            return
+        if self._pubsub.connection is not None:
+            self._pubsub.connection.deregister_connect_callback(
+                self._on_connect
+            )
+        self._pubsub.close()
+        self._pubsub = None
+
+    def _subscribe(self) -> None:
+        self.close()
+        pubsub = self._client.pubsub()
+        pubsub.psubscribe(KEYEVENT_PATTERN)
+        pubsub.connection.register_connect_callback(self._on_connect)
+        self._pubsub = pubsub
+        self._notifications_lost = False
+        self._client.flushall()
+        # Make sure subscription is active before any write
+        self._collect_keys()
+
+    def _collect_keys(self) -> typing.Optional[typing.Set[bytes]]:
+        assert self._pubsub is not None
+        # Reply to PING is queued after notifications of all preceding writes
+        self._pubsub.ping()
+        keys: typing.Set[bytes] = set()
+        is_complete = True
+        while True:
+            message = self._pubsub.get_message(timeout=PONG_TIMEOUT)
+            if self._notifications_lost:
+                # PING might be sent before reconnect, reply would not come
+                return None
+            if message is None:
+                raise redisdb.TimeoutError(
+                    'Keyspace notifications were not received in time'
+                )
+            if message['type'] == 'pong':
+                break
+            if message['type'] != 'pmessage':
+                continue
+            prefix, _, event = message['channel'].partition(b':')
+            if prefix != f'__keyevent@{self._db}__'.encode():
+                is_complete = False
+            elif event in REMOVE_EVENTS:
+                keys.discard(message['data'])
+            else:
+                keys.add(message['data'])
+        if not is_complete:
+            return None
+        return keys
+
+    def _on_connect(self, connection) -> None:
+        # redis-py silently resubscribes on reconnect, notifications sent
+        # meanwhile are lost
+        self._notifications_lost = True
+
+
+def _get_db(client: redisdb.Redis) -> int:
+    return client.connection_pool.connection_kwargs.get('db', 0)
+
+
+def _unlink(client: redisdb.Redis, keys: typing.Collection[bytes]) -> None:
+    # Keys are unlinked one by one, cluster nodes refuse cross-slot commands
+    pipeline = client.pipeline(transaction=False)
+    for index, key in enumerate(keys, start=1):
+        pipeline.unlink(key)
+        if index % UNLINK_CHUNK_SIZE == 0:
+            pipeline.execute()
+    pipeline.execute()
@@ -4,7 +4,15 @@ import warnings
 import pytest
 import redis as redisdb
 
-from . import service
+from testsuite.plugins import object_hook
+
+from . import cleanup, service
+
+PIPELINE_CHUNK_SIZE = 1000
+# First argument of these commands is not a key
+SCRIPT_COMMANDS = frozenset(
+    ['eval', 'eval_ro', 'evalsha', 'evalsha_ro', 'fcall', 'fcall_ro']
+)
 
 
 def pytest_addoption(parser):
@@ -21,6 +29,14 @@ def pytest_addoption(parser):
         help='Do not fill redis storage',
         action='store_true',
     )
+    group.addoption(
+        '--redis-selective-cleanup',
+        action='store_true',
+        help=(
+            'Unlink keys modified by test instead of flushing redis, '
+            'modified keys are tracked with keyspace notifications.'
+        ),
+    )
 
 
 def pytest_configure(config):
@@ -80,6 +96,7 @@ async def redis_standalone_service(
 def redis_store(
     pytestconfig,
     _redis_store,
+    _redis_keyspace_tracker,
     _redis_execute_commands_from_file,
 ):
     if pytestconfig.option.no_redis:
@@ -92,7 +109,10 @@ def redis_store(
         _redis_execute_commands_from_file('redis_store', redis_db)
         yield redis_db
     finally:
-        redis_db.flushall()
+        if _redis_keyspace_tracker:
+            _redis_keyspace_tracker.cleanup()
+        else:
+            redis_db.flushall()
 
 
 @pytest.fixture
@@ -119,9 +139,15 @@ def redis_sentinel(
 def redis_cluster_store(
     pytestconfig,
     _redis_cluster_store,
+    _redis_cluster_keyspace_tracker,
     _redis_execute_commands_from_file,
 ):
     def _flush_all(redis_db):
+        if _redis_cluster_keyspace_tracker:
+            # Nothing to replicate if nothing was changed
+            if _redis_cluster_keyspace_tracker.cleanup():
+                redis_db.wait(1, 10, target_nodes=redis_db.get_primaries())
+            return
         slot_infos = redis_db.cluster_slots()
         nodes = redis_db.get_primaries()
         redis_db.flushall(target_nodes=nodes)
@@ -262,6 +288,41 @@ def _redis_cluster_store(
     yield redis_db
 
 
+@pytest.fixture(scope='session')
+def _redis_keyspace_tracker(pytestconfig, _redis_store):
+    if (
+        pytestconfig.option.no_redis
+        or not pytestconfig.option.redis_selective_cleanup
+    ):
+        yield None
+        return
+    tracker = cleanup.KeyspaceTracker([_redis_store])
+    try:
+        yield tracker
+    finally:
+        tracker.close()
+
+
+@pytest.fixture(scope='session')
+def _redis_cluster_keyspace_tracker(pytestconfig, _redis_cluster_store):
+    if (
+        pytestconfig.option.no_redis
+        or not pytestconfig.option.redis_selective_cleanup
+    ):
+        yield None
+        return
+    tracker = cleanup.KeyspaceTracker(
+        [
+            node.redis_connection
+            for node in _redis_cluster_store.get_primaries()
+        ],
+    )
+    try:
+        yield tracker
+    finally:
+        tracker.close()
+
+
 @pytest.fixture
 def redis_standalone_store(
     pytestconfig, redis_standalone_service, redis_standalone_node
@@ -281,25 +342,92 @@ def redis_standalone_store(
         redis_db.flushall()
 
 
+@pytest.fixture(scope='session')
+def _redis_commands_cache(_base_object_hook):
+    return object_hook.ParsedFilesCache(_base_object_hook())
+
+
 @pytest.fixture
-def _redis_execute_commands_from_file(request, load_json):
+def _redis_execute_commands_from_file(
+    request,
+    get_file_path,
+    load_json,
+    _redis_commands_cache,
+):
+    """Execute commands from store marks through non-transactional pipeline.
+
+    Parsed command files are cached for the session unless they use per-test
+    object hooks, e.g. ``$mockserver``.
+    """
+
+    def _load_commands(store_file):
+        filename = '%s.json' % store_file
+        return _redis_commands_cache.load(
+            get_file_path(filename),
+            lambda: load_json(filename, object_hook=_json_object_hook),
+        )
+
     def _execute_commands(markers, redis_db):
         redis_commands = []
 
         for mark in request.node.iter_markers(markers):
             store_file = mark.kwargs.get('file')
             if store_file is not None:
-                redis_commands_from_file = load_json(
-                    '%s.json' % store_file,
-                    object_hook=_json_object_hook,
-                )
-                redis_commands.extend(redis_commands_from_file)
+                redis_commands.extend(_load_commands(store_file))
 
             if mark.args:
                 redis_commands.extend(mark.args)
 
-        for redis_command in redis_commands:
-            func = getattr(redis_db, redis_command[0])
-            func(*redis_command[1:])
+        if isinstance(redis_db, redisdb.RedisCluster):
+            _execute_cluster_commands(redis_db, redis_commands)
+        else:
+            _execute_pipelined(redis_db, redis_commands)
 
     return _execute_commands
+
+
+def _execute_pipelined(redis_db, redis_commands):
+    if not redis_commands:
+        return
+    pipeline = redis_db.pipeline(transaction=False)
+    for offset in range(0, len(redis_commands), PIPELINE_CHUNK_SIZE):
+        for redis_command in redis_commands[
+            offset : offset + PIPELINE_CHUNK_SIZE
+        ]:
+            func = getattr(pipeline, redis_command[0])
+            func(*redis_command[1:])
+        pipeline.execute()
+
+
+def _execute_cluster_commands(redis_db, redis_commands):
+    """Commands are pipelined in batches ordered by key slot.
+
+    Order of commands within slot is preserved. Commands not supported by
+    cluster pipeline or without key are executed directly, commands before
+    them are flushed first.
+    """
+    batch = []
+    for redis_command in redis_commands:
+        if _is_cluster_pipelined(redis_command):
+            batch.append(redis_command)
+            continue
+        _execute_pipelined(redis_db, _sort_by_slot(redis_db, batch))
+        batch = []
+        func = getattr(redis_db, redis_command[0])
+        func(*redis_command[1:])
+    _execute_pipelined(redis_db, _sort_by_slot(redis_db, batch))
+
+
+def _is_cluster_pipelined(redis_command) -> bool:
+    name = redis_command[0]
+    if len(redis_command) < 2 or name in SCRIPT_COMMANDS:
+        return False
+    command = name.upper().replace('_', ' ')
+    return command not in redisdb.cluster.PIPELINE_BLOCKED_COMMANDS
+
+
+def _sort_by_slot(redis_db, redis_commands):
+    return sorted(
+        redis_commands,
+        key=lambda redis_command: redis_db.keyslot(redis_command[1]),
+    )
@@ -123,3 +123,12 @@ def ensure_service_started(pytestconfig):
     env: TestsuiteEnvironmentPlugin
     env = pytestconfig.pluginmanager.get_plugin('testsuite_environment')
     return env.ensure_started
+
+
+@pytest.fixture(scope='session')
+def testsuite_env_dir(pytestconfig) -> pathlib.Path:
+    """Path to testsuite environment data directory."""
+    config = control.load_environment_config(
+        env_dir=pytestconfig.option.env_dir,
+    )
+    return config.env_dir
@@ -499,7 +499,7 @@ def _cached_stat_path():
             data = iterdir_cache.get(cache_key)
             if data is None:
                 data = tuple(super().iterdir())
-                content_cache[cache_key] = data
+                iterdir_cache[cache_key] = data
             return data
 
         def read_bytes(self):
@@ -1,5 +1,49 @@
+import pathlib
+import typing
+
 import pytest
 
+_T = typing.TypeVar('_T')
+
+
+class ParsedFilesCache:
+    """Static files parsed once per session.
+
+    Entries are keyed by file path, mtime and size. Files using object hooks
+    built from per-test fixtures, e.g. ``$mockserver``, are parsed on every
+    load as the result depends on the test.
+    """
+
+    def __init__(self, object_hooks: typing.Mapping[str, typing.Any]) -> None:
+        self._per_test_hooks = get_per_test_hooks(object_hooks)
+        self._entries: typing.Dict[
+            typing.Tuple[pathlib.Path, int, int], typing.Any
+        ] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, path: pathlib.Path, parse: typing.Callable[[], _T]) -> _T:
+        """Returns cached result of ``parse`` for file at ``path``."""
+        stat = path.stat()
+        cache_key = (path, stat.st_mtime_ns, stat.st_size)
+        if cache_key in self._entries:
+            result = self._entries[cache_key]
+            if result is not None:
+                return result
+            return parse()
+
+        content = path.read_text()
+        result = parse()
+        if self.has_per_test_hooks(content):
+            self._entries[cache_key] = None
+        else:
+            self._entries[cache_key] = result
+        return result
+
+    def has_per_test_hooks(self, content: str) -> bool:
+        return any(hook in content for hook in self._per_test_hooks)
+
 
 class Hookspec:
     def pytest_register_object_hooks(self):
@@ -48,3 +92,14 @@ def object_hook(request, _base_object_hook):
             hook = request.getfixturevalue(hook['$fixture'])
         hooks[name] = hook
     return hooks
+
+
+def get_per_test_hooks(
+    object_hooks: typing.Mapping[str, typing.Any],
+) -> typing.List[str]:
+    """Returns quoted names of object hooks built from per-test fixtures."""
+    return [
+        f'"{name}"'
+        for name, hook in object_hooks.items()
+        if isinstance(hook, dict) and '$fixture' in hook
+    ]
@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import typing
+
+logger = logging.getLogger(__name__)
+
+# Files modified recently are not cached, another modification within mtime
+# granularity would keep the same mtime.
+RACY_INTERVAL_NS = 2 * 10**9
+
+_T = typing.TypeVar('_T')
+
+
+class FilesCache:
+    """Values computed from files, persisted between sessions as JSON.
+
+    Entries are keyed by file path and validated by size, mtime and inode,
+    so unchanged files are not read again. Values that do not survive JSON
+    round trip are not cached.
+    """
+
+    def __init__(self, path: typing.Optional[pathlib.Path] = None) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._modified = False
+        self._entries: typing.Dict[str, typing.List] = {}
+        if path is not None:
+            try:
+                with path.open() as cache_file:
+                    entries = json.load(cache_file)
+            except (OSError, ValueError):
+                pass
+            else:
+                if isinstance(entries, dict):
+                    self._entries = entries
+
+    def get(
+        self,
+        path: pathlib.Path,
+        compute: typing.Callable[[pathlib.Path], _T],
+    ) -> _T:
+        """Returns cached value for file or computes it with ``compute``."""
+        stat = path.stat()
+        signature = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+        key = str(path)
+        entry = self._entries.get(key)
+        if isinstance(entry, list) and entry[:3] == signature:
+            return entry[3]
+        value = compute(path)
+        if time.time_ns() - stat.st_mtime_ns > RACY_INTERVAL_NS:
+            try:
+                is_serializable = json.loads(json.dumps(value)) == value
+            except (TypeError, ValueError):
+                is_serializable = False
+            if is_serializable:
+                with self._lock:
+                    self._entries[key] = [*signature, value]
+                    self._modified = True
+        return value
+
+    def save(self) -> None:
+        """Store cache file if new entries were added."""
+        if self._path is None or not self._modified:
+            return
+        tmp_path = self._path.with_name(f'{self._path.name}.{os.getpid()}')
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open('w') as cache_file:
+                json.dump(self._entries, cache_file)
+            os.replace(tmp_path, self._path)
+        except OSError as exc:
+            logger.warning('Failed to save cache %s: %r', self._path, exc)
+        else:
+            self._modified = False